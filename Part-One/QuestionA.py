@@ -1,4 +1,21 @@
-def find_min_max(arr, low, high):
+from divide_conquer import DivideAndConquer, run
+from instrumentation import active
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def find_min_max(arr, low, high, cutoff=64, workers=0):
+    stats = active()
+    if stats is not None:
+        with stats.timer("find_min_max"):
+            return _find_min_max_instrumented(arr, low, high, stats, 0)
+    return run(MinMaxAlgorithm(), (arr, low, high), cutoff, workers)
+
+
+def _find_min_max(arr, low, high):
 
     if low == high:
         return arr[low], arr[low]
@@ -12,8 +29,8 @@ def find_min_max(arr, low, high):
 
     mid = (low + high) // 2
 
-    min1, max1 = find_min_max(arr, low, mid)
-    min2, max2 = find_min_max(arr, mid + 1, high)
+    min1, max1 = _find_min_max(arr, low, mid)
+    min2, max2 = _find_min_max(arr, mid + 1, high)
 
     overall_min = min(min1, min2)
     overall_max = max(max1, max2)
@@ -21,11 +38,185 @@ def find_min_max(arr, low, high):
     return overall_min, overall_max
 
 
-arr = [8, 3, 5, 9, 1, 7, 2, 6]
-min_val, max_val = find_min_max(arr, 0, len(arr) - 1)
-print("Divide & Conquer -> Minimum:", min_val)
-print("Divide & Conquer -> Maximum:", max_val)
+def _find_min_max_instrumented(arr, low, high, stats, depth):
+    stats.record_depth("find_min_max", depth)
+
+    if low == high:
+        return arr[low], arr[low]
+
+    if high == low + 1:
+        stats.count("find_min_max comparisons")
+        if arr[low] < arr[high]:
+            return arr[low], arr[high]
+        else:
+            return arr[high], arr[low]
+
+    mid = (low + high) // 2
 
+    min1, max1 = _find_min_max_instrumented(arr, low, mid, stats, depth + 1)
+    min2, max2 = _find_min_max_instrumented(arr, mid + 1, high, stats, depth + 1)
+
+    stats.count("find_min_max comparisons", 2)
+    return min(min1, min2), max(max1, max2)
+
+
+class SparseTableMinMax:
+
+    def __init__(self, arr):
+        self.n = len(arr)
+        self.mins = [list(arr)]
+        self.maxs = [list(arr)]
+
+        k = 1
+        while (1 << k) <= self.n:
+            half = 1 << (k - 1)
+            prev_min = self.mins[-1]
+            prev_max = self.maxs[-1]
+            size = self.n - (1 << k) + 1
+            self.mins.append([min(prev_min[i], prev_min[i + half]) for i in range(size)])
+            self.maxs.append([max(prev_max[i], prev_max[i + half]) for i in range(size)])
+            k += 1
+
+        if np is not None:
+            self.np_mins = [np.asarray(level) for level in self.mins]
+            self.np_maxs = [np.asarray(level) for level in self.maxs]
+
+    def range_min_max(self, low, high):
+        k = (high - low + 1).bit_length() - 1
+        right = high - (1 << k) + 1
+        return (min(self.mins[k][low], self.mins[k][right]),
+                max(self.maxs[k][low], self.maxs[k][right]))
+
+    def range_min_max_batch(self, lows, highs):
+        if np is None:
+            results = [self.range_min_max(l, h) for l, h in zip(lows, highs)]
+            return [r[0] for r in results], [r[1] for r in results]
+
+        lows = np.asarray(lows, dtype=np.int64)
+        highs = np.asarray(highs, dtype=np.int64)
+        lengths = highs - lows + 1
+        levels = np.floor(np.log2(lengths)).astype(np.int64)
+        rights = highs - (np.int64(1) << levels) + 1
+
+        out_min = np.empty(len(lows), dtype=self.np_mins[0].dtype)
+        out_max = np.empty(len(lows), dtype=self.np_maxs[0].dtype)
+        for k in np.unique(levels):
+            sel = levels == k
+            out_min[sel] = np.minimum(self.np_mins[k][lows[sel]], self.np_mins[k][rights[sel]])
+            out_max[sel] = np.maximum(self.np_maxs[k][lows[sel]], self.np_maxs[k][rights[sel]])
+        return out_min, out_max
+
+
+class SegmentTreeMinMax:
+
+    def __init__(self, arr):
+        self.n = len(arr)
+        self.mins = [None] * (4 * self.n)
+        self.maxs = [None] * (4 * self.n)
+        if self.n > 0:
+            self._build(arr, 1, 0, self.n - 1)
+
+    def _build(self, arr, node, low, high):
+        if low == high:
+            self.mins[node] = arr[low]
+            self.maxs[node] = arr[low]
+            return
+
+        mid = (low + high) // 2
+        self._build(arr, 2 * node, low, mid)
+        self._build(arr, 2 * node + 1, mid + 1, high)
+
+        self.mins[node] = min(self.mins[2 * node], self.mins[2 * node + 1])
+        self.maxs[node] = max(self.maxs[2 * node], self.maxs[2 * node + 1])
+
+    def update(self, index, value):
+        node, low, high = 1, 0, self.n - 1
+        path = []
+        while low != high:
+            path.append(node)
+            mid = (low + high) // 2
+            if index <= mid:
+                node, high = 2 * node, mid
+            else:
+                node, low = 2 * node + 1, mid + 1
+
+        self.mins[node] = value
+        self.maxs[node] = value
+        for node in reversed(path):
+            self.mins[node] = min(self.mins[2 * node], self.mins[2 * node + 1])
+            self.maxs[node] = max(self.maxs[2 * node], self.maxs[2 * node + 1])
+
+    def range_min_max(self, low, high):
+        overall_min = float('inf')
+        overall_max = float('-inf')
+        stack = [(1, 0, self.n - 1)]
+
+        while stack:
+            node, node_low, node_high = stack.pop()
+            if node_high < low or node_low > high:
+                continue
+            if low <= node_low and node_high <= high:
+                overall_min = min(overall_min, self.mins[node])
+                overall_max = max(overall_max, self.maxs[node])
+                continue
+            mid = (node_low + node_high) // 2
+            stack.append((2 * node, node_low, mid))
+            stack.append((2 * node + 1, mid + 1, node_high))
+
+        return overall_min, overall_max
+
+    def range_min_max_batch(self, lows, highs):
+        results = [self.range_min_max(int(l), int(h)) for l, h in zip(lows, highs)]
+        mins = [r[0] for r in results]
+        maxs = [r[1] for r in results]
+        if np is not None:
+            return np.asarray(mins), np.asarray(maxs)
+        return mins, maxs
+
+
+class MinMaxAlgorithm(DivideAndConquer):
+
+    def size(self, problem):
+        arr, low, high = problem
+        return high - low + 1
+
+    def is_base(self, problem):
+        arr, low, high = problem
+        return high - low <= 1
+
+    def base(self, problem):
+        return _find_min_max(*problem)
+
+    def sequential(self, problem):
+        return _find_min_max(*problem)
+
+    def divide(self, problem):
+        arr, low, high = problem
+        mid = (low + high) // 2
+        return [(arr, low, mid), (arr, mid + 1, high)]
+
+    def combine(self, problem, results):
+        (min1, max1), (min2, max2) = results
+        return min(min1, min2), max(max1, max2)
+
+    def scatter(self, problem):
+        arr, low, high = problem
+        return arr[low:high + 1], 0, high - low
+
+
+if __name__ == "__main__":
+    arr = [8, 3, 5, 9, 1, 7, 2, 6]
+    min_val, max_val = find_min_max(arr, 0, len(arr) - 1)
+    print("Divide & Conquer -> Minimum:", min_val)
+    print("Divide & Conquer -> Maximum:", max_val)
+    print("Explicit stack, no cutoff -> (Min, Max):", find_min_max(arr, 0, len(arr) - 1, cutoff=0))
+
+    sparse = SparseTableMinMax(arr)
+    print("Sparse Table -> Range [2, 5]:", sparse.range_min_max(2, 5))
+
+    tree = SegmentTreeMinMax(arr)
+    tree.update(4, 10)
+    print("Segment Tree (after arr[4] = 10) -> Range [2, 5]:", tree.range_min_max(2, 5))
 
 """
 ------------------------------------------------------------
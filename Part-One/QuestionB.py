@@ -10,10 +10,11 @@ def power_divide_conquer(a, n):
         return a * half * half
 
 
-a = 3
-n = 13
-result = power_divide_conquer(a, n)
-print(f"Divide & Conquer -> {a}^{n} = {result}")
+if __name__ == "__main__":
+    a = 3
+    n = 13
+    result = power_divide_conquer(a, n)
+    print(f"Divide & Conquer -> {a}^{n} = {result}")
 
 """
 ------------------------------------------------------------
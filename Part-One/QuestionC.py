@@ -1,46 +1,279 @@
+import heapq
+import mmap
+import os
+import tempfile
+from array import array
+from itertools import accumulate, repeat
+
+from divide_conquer import DivideAndConquer, run
+from external_sort import read_records
+from instrumentation import active
+from workloads import near_reverse_sorted, near_sorted, random_permutation, reverse_sorted, sorted_permutation
+
+
 def merge_and_count(arr, low, mid, high):
-    left = arr[low:mid+1]
-    right = arr[mid+1:high+1]
-    i = j = 0
-    k = low
+    return _merge_counting(arr[low:high+1], 0, mid - low + 1, high - low + 1, arr, low)
+
+
+def _merge_counting(src, low, mid, high, dst, k):
+    # Merges the sorted ranges src[low:mid] and src[mid:high] into dst starting
+    # at k and returns the number of inversions between them
+    i, j = low, mid
     inversions = 0
 
-    while i < len(left) and j < len(right):
-        if left[i] <= right[j]:
-            arr[k] = left[i]
+    while i < mid and j < high:
+        if src[i] <= src[j]:
+            dst[k] = src[i]
             i += 1
         else:
-            arr[k] = right[j]
+            dst[k] = src[j]
             j += 1
-            inversions += (len(left) - i)
-        k += 1
-
-    while i < len(left):
-        arr[k] = left[i]
-        i += 1
+            inversions += (mid - i)
         k += 1
 
-    while j < len(right):
-        arr[k] = right[j]
-        j += 1
-        k += 1
+    dst[k:k + mid - i] = src[i:mid]
+    k += mid - i
+    dst[k:k + high - j] = src[j:high]
 
     return inversions
 
 
-def count_inversions(arr, low, high):
+def count_inversions(arr, low, high, cutoff=64, workers=0):
+    stats = active()
+    if stats is not None:
+        with stats.timer("count_inversions"):
+            return _count_inversions_instrumented(arr, low, high, stats, 0)
+    count, _ = run(InversionAlgorithm(), (arr, low, high), cutoff, workers)
+    return count
+
+
+def _count_inversions(arr, low, high):
+    inv_count = 0
+    if low < high:
+        mid = (low + high) // 2
+        inv_count += _count_inversions(arr, low, mid)
+        inv_count += _count_inversions(arr, mid + 1, high)
+        inv_count += merge_and_count(arr, low, mid, high)
+    return inv_count
+
+
+def _count_inversions_instrumented(arr, low, high, stats, depth):
+    stats.record_depth("count_inversions", depth)
     inv_count = 0
     if low < high:
         mid = (low + high) // 2
-        inv_count += count_inversions(arr, low, mid)
-        inv_count += count_inversions(arr, mid + 1, high)
+        inv_count += _count_inversions_instrumented(arr, low, mid, stats, depth + 1)
+        inv_count += _count_inversions_instrumented(arr, mid + 1, high, stats, depth + 1)
         inv_count += merge_and_count(arr, low, mid, high)
+        stats.count("count_inversions elements merged", high - low + 1)
     return inv_count
 
 
+class InversionAlgorithm(DivideAndConquer):
+    # Sorts arr[low..high] in place like _count_inversions. Results are
+    # (inversions, array that was sorted): the caller's own array, or a
+    # worker's sorted copy of its slice, which gather() writes back.
+
+    def size(self, problem):
+        arr, low, high = problem
+        return high - low + 1
+
+    def is_base(self, problem):
+        arr, low, high = problem
+        return high <= low
+
+    def base(self, problem):
+        return 0, problem[0]
+
+    def sequential(self, problem):
+        return _count_inversions(*problem), problem[0]
+
+    def divide(self, problem):
+        arr, low, high = problem
+        mid = (low + high) // 2
+        return [(arr, low, mid), (arr, mid + 1, high)]
+
+    def combine(self, problem, results):
+        arr, low, high = problem
+        (left_count, _), (right_count, _) = results
+        cross = merge_and_count(arr, low, (low + high) // 2, high)
+        return left_count + right_count + cross, arr
+
+    def scatter(self, problem):
+        arr, low, high = problem
+        return arr[low:high + 1], 0, high - low
+
+    def gather(self, problem, result):
+        arr, low, high = problem
+        count, part = result
+        arr[low:high + 1] = part
+        return count, arr
+
+
+# Rough cost of one element while a run is held as a Python list, including
+# the merge buffer
+ELEMENT_BYTES = 80
+
+
+def count_cross_inversions(left, right, factor=1, comparisons=None):
+    # Pairs (x, y) with x in left, y in right and x > factor * y, for two sorted
+    # lists. `comparisons`, if given, is a one-element list that receives the
+    # number of element comparisons made.
+    count, compared = _cross_count(left, 0, len(left), right, 0, len(right), factor)
+    if comparisons is not None:
+        comparisons[0] += compared
+    return count
+
+
+def _cross_count(a, low, a_end, b, start, b_end, factor):
+    # Same on the sorted ranges a[low:a_end] and b[start:b_end], without
+    # slicing; returns (count, comparisons). Once every y is below the
+    # threshold the remaining x all count fully.
+    count = 0
+    j = start
+    for i in range(low, a_end):
+        x = a[i]
+        while j < b_end and x > factor * b[j]:
+            j += 1
+        if j == b_end:
+            return count + (a_end - i) * (b_end - start), (b_end - start) + (i - low)
+        count += j - start
+    return count, (j - start) + (a_end - low)
+
+
+def _count_scaled_inversions(arr, factor=1):
+    # Pairs i < j with arr[i] > factor * arr[j], counted by a bottom-up merge
+    # sort that ping-pongs between arr and one scratch buffer allocated up
+    # front, so no level slices or allocates. arr ends up sorted.
+    n = len(arr)
+    src, dst = arr, arr[:]
+    count = 0
+    width = 1
+
+    while width < n:
+        for low in range(0, n, 2 * width):
+            mid = min(low + width, n)
+            high = min(low + 2 * width, n)
+            if factor != 1:
+                count += _cross_count(src, low, mid, src, mid, high, factor)[0]
+            inversions = _merge_counting(src, low, mid, high, dst, low)
+            if factor == 1:
+                count += inversions
+
+        src, dst = dst, src
+        width *= 2
+
+    if src is not arr:
+        arr[:] = src
+    return count
+
+
+class _RunCounter:
+    # Fenwick tree over run indices: how many elements of each run were consumed
+
+    def __init__(self, runs):
+        self.tree = [0] * (runs + 1)
+
+    def add(self, run):
+        run += 1
+        while run < len(self.tree):
+            self.tree[run] += 1
+            run += run & -run
+
+    def before(self, run):
+        total = 0
+        while run:
+            total += self.tree[run]
+            run -= run & -run
+        return total
+
+
+def count_inversions_external(path, typecode="q", memory_limit=64 << 20, factor=1, tmpdir=None):
+    # Counts pairs i < j with a[i] > factor * a[j] in a binary file of
+    # `typecode` values. Memory-sized runs are read through an mmap, counted
+    # and sorted in memory, and spilled to disk; cross-run pairs are counted
+    # while the sorted runs are k-way merged.
+    if os.path.getsize(path) == 0:
+        return 0
+    run_size = max(memory_limit // ELEMENT_BYTES, 2)
+    total = 0
+
+    with tempfile.TemporaryDirectory(dir=tmpdir) as workdir:
+        runs = []
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            values = memoryview(mm).cast(typecode)
+            for start in range(0, len(values), run_size):
+                chunk = values[start:start + run_size].tolist()
+                total += _count_scaled_inversions(chunk, factor)
+                run_path = os.path.join(workdir, f"run_{len(runs)}.bin")
+                with open(run_path, "wb") as out:
+                    array(typecode, chunk).tofile(out)
+                runs.append((run_path, len(chunk)))
+                del chunk
+            values.release()
+
+        # Elements of earlier runs that are still "above" the current value
+        # form the cross-run inversions. With factor 1 the merge itself is the
+        # threshold cursor (ties leave earlier runs first); otherwise a second
+        # merge advances over everything <= factor * value.
+        earlier = [0] + list(accumulate(size for _, size in runs))
+        consumed = _RunCounter(len(runs))
+        cursors = 1 if factor == 1 else 2
+        block = max(run_size // (cursors * len(runs) + 1), 1)
+
+        def merged():
+            return heapq.merge(*(zip(read_records(run_path, typecode, block), repeat(index))
+                                 for index, (run_path, _) in enumerate(runs)))
+
+        if factor == 1:
+            for value, index in merged():
+                total += earlier[index] - consumed.before(index)
+                consumed.add(index)
+        else:
+            threshold = merged()
+            pending = next(threshold, None)
+            for value, index in merged():
+                limit = factor * value
+                while pending is not None and pending[0] <= limit:
+                    consumed.add(pending[1])
+                    pending = next(threshold, None)
+                total += earlier[index] - consumed.before(index)
+
+    return total
+
+
+
+if __name__ == "__main__":
+    arr = [2, 4, 1, 3, 5]
+    arr_copy = arr.copy()
+    inversions = count_inversions(arr_copy, 0, len(arr_copy) - 1)
+    print("Array:", arr)
+    print("Number of inversions:", inversions)
+    print("Number of inversions (explicit stack, no cutoff):", count_inversions(arr[:], 0, len(arr) - 1, cutoff=0))
+
+    values = [(i * 7919) % 1000 for i in range(1000)]
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "values.bin")
+        with open(path, "wb") as f:
+            array("q", values).tofile(f)
+        external = count_inversions_external(path, memory_limit=64 * ELEMENT_BYTES)
+    print("Inversions in a 1000-value file (external, 64-element runs):", external)
+    print("Inversions in the same values (in memory):", count_inversions(values[:], 0, len(values) - 1))
 
-arr = [2, 4, 1, 3, 5]
-arr_copy = arr.copy()
-inversions = count_inversions(arr_copy, 0, len(arr_copy) - 1)
-print("Array:", arr)
-print("Number of inversions:", inversions)
\ No newline at end of file
+    n = 1000
+    workloads = {
+        "sorted": sorted_permutation(n),
+        "near sorted": near_sorted(n, 20, seed=1),
+        "random": random_permutation(n, seed=1),
+        "near reverse sorted": near_reverse_sorted(n, 20, seed=1),
+        "reverse sorted": reverse_sorted(n),
+    }
+    print(f"Inversions in {n}-element permutations (at most {n * (n - 1) // 2}):")
+    with tempfile.TemporaryDirectory() as folder:
+        for name, perm in workloads.items():
+            path = os.path.join(folder, "perm.bin")
+            with open(path, "wb") as f:
+                array("q", perm).tofile(f)
+            external = count_inversions_external(path, memory_limit=64 * ELEMENT_BYTES, tmpdir=folder)
+            in_memory = count_inversions(perm[:], 0, n - 1)
+            print(f"{name:>20}: {in_memory} (external: {external})")
@@ -1,23 +1,325 @@
-def closest_pair_1d(arr, low, high):
+import heapq
+from bisect import bisect_left, bisect_right, insort
+
+from divide_conquer import DivideAndConquer, run
+from instrumentation import active
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def closest_pair_1d(arr, low, high, cutoff=64, workers=0):
+    stats = active()
+    if stats is not None:
+        with stats.timer("closest_pair_1d"):
+            return _closest_pair_1d_instrumented(arr, low, high, stats, 0)
+    return run(ClosestPair1DAlgorithm(), (arr, low, high), cutoff, workers)
+
+
+def _closest_pair_1d(arr, low, high):
     if high - low == 1:
         return abs(arr[high] - arr[low])
     elif low == high:
         return float('inf')
     else:
         mid = (low + high) // 2
-        d1 = closest_pair_1d(arr, low, mid)
-        d2 = closest_pair_1d(arr, mid + 1, high)
+        d1 = _closest_pair_1d(arr, low, mid)
+        d2 = _closest_pair_1d(arr, mid + 1, high)
         d3 = abs(arr[mid + 1] - arr[mid])
         return min(d1, d2, d3)
 
 
+def _closest_pair_1d_instrumented(arr, low, high, stats, depth):
+    stats.record_depth("closest_pair_1d", depth)
+    if high - low == 1:
+        stats.count("closest_pair_1d differences")
+        return abs(arr[high] - arr[low])
+    elif low == high:
+        return float('inf')
+    else:
+        mid = (low + high) // 2
+        d1 = _closest_pair_1d_instrumented(arr, low, mid, stats, depth + 1)
+        d2 = _closest_pair_1d_instrumented(arr, mid + 1, high, stats, depth + 1)
+        stats.count("closest_pair_1d differences")
+        d3 = abs(arr[mid + 1] - arr[mid])
+        return min(d1, d2, d3)
+
+
+class ClosestPair1DAlgorithm(DivideAndConquer):
+
+    def size(self, problem):
+        arr, low, high = problem
+        return high - low + 1
+
+    def is_base(self, problem):
+        arr, low, high = problem
+        return high - low <= 1
+
+    def base(self, problem):
+        return _closest_pair_1d(*problem)
+
+    def sequential(self, problem):
+        return _closest_pair_1d(*problem)
+
+    def divide(self, problem):
+        arr, low, high = problem
+        mid = (low + high) // 2
+        return [(arr, low, mid), (arr, mid + 1, high)]
+
+    def combine(self, problem, results):
+        arr, low, high = problem
+        mid = (low + high) // 2
+        return min(results[0], results[1], abs(arr[mid + 1] - arr[mid]))
+
+    def scatter(self, problem):
+        arr, low, high = problem
+        return arr[low:high + 1], 0, high - low
+
+
+def min_gap(values, mode="sort"):
+    # Returns (gap, a, b) with a <= b; the input does not need to be sorted.
+    # "sort" sorts a copy (with NumPy when available), "bucket" uses pigeonhole
+    # buckets and runs in expected O(n) unless the values are heavily clustered.
+    if len(values) < 2:
+        return float('inf'), None, None
+    if mode == "sort":
+        return _min_gap_sort(values)
+    if mode == "bucket":
+        return _min_gap_bucket(values)
+    raise ValueError(f"unknown mode: {mode}")
+
+
+def _min_gap_sort(values):
+    if np is not None:
+        arr = np.sort(np.asarray(values))
+        gaps = np.diff(arr)
+        i = int(np.argmin(gaps))
+        return gaps[i].item(), arr[i].item(), arr[i + 1].item()
+    
+    arr = sorted(values)
+    i = min(range(len(arr) - 1), key=lambda k: arr[k + 1] - arr[k])
+    return arr[i + 1] - arr[i], arr[i], arr[i + 1]
+
+
+def _min_gap_bucket(values):
+    lo = min(values)
+    hi = max(values)
+    if lo == hi:
+        return 0, lo, hi
+    
+    # n buckets spanning [lo, hi]; the assignment is monotonic in the value,
+    # so the closest pair is either inside one bucket or straddles two
+    # neighbouring non-empty buckets.
+    n = len(values)
+    span = hi - lo
+    buckets = [None] * n
+    for x in values:
+        idx = min(int((x - lo) * n / span), n - 1)
+        if buckets[idx] is None:
+            buckets[idx] = [x]
+        else:
+            buckets[idx].append(x)
+    
+    best = (float('inf'), None, None)
+    previous_max = None
+    for bucket in buckets:
+        if bucket is None:
+            continue
+        if len(bucket) > 1:
+            bucket.sort()
+            for a, b in zip(bucket, bucket[1:]):
+                if b - a < best[0]:
+                    best = (b - a, a, b)
+            if best[0] == 0:
+                return best
+        if previous_max is not None and bucket[0] - previous_max < best[0]:
+            best = (bucket[0] - previous_max, previous_max, bucket[0])
+        previous_max = bucket[-1]
+    return best
+
+
+def min_gaps_batch(rows):
+    # Minimum gap of every row of a 2D array
+    arr = np.sort(np.asarray(rows), axis=1)
+    return np.diff(arr, axis=1).min(axis=1)
+
+
+class SortedBlocks:
+    # Sorted multiset kept as a list of sorted blocks plus each block's
+    # maximum (the layout used by sortedcontainers.SortedList). A lookup
+    # bisects the maxima and then one block, so updates cost O(log n + LOAD)
+    # instead of shifting one big list.
+    
+    LOAD = 512
+    
+    def __init__(self, values=()):
+        values = sorted(values)
+        self.blocks = [values[i:i + self.LOAD] for i in range(0, len(values), self.LOAD)]
+        self.maxes = [block[-1] for block in self.blocks]
+        self.size = len(values)
+    
+    def __len__(self):
+        return self.size
+    
+    def __iter__(self):
+        for block in self.blocks:
+            yield from block
+    
+    def add(self, x):
+        self.size += 1
+        if not self.blocks:
+            self.blocks.append([x])
+            self.maxes.append(x)
+            return
+        k = min(bisect_left(self.maxes, x), len(self.blocks) - 1)
+        block = self.blocks[k]
+        insort(block, x)
+        self.maxes[k] = block[-1]
+        if len(block) > 2 * self.LOAD:
+            self.blocks[k:k + 1] = [block[:self.LOAD], block[self.LOAD:]]
+            self.maxes[k:k + 1] = [block[self.LOAD - 1], block[-1]]
+    
+    def remove(self, x):
+        k = bisect_left(self.maxes, x)
+        if k < len(self.blocks):
+            block = self.blocks[k]
+            i = bisect_left(block, x)
+            if block[i] == x:
+                del block[i]
+                self.size -= 1
+                if block:
+                    self.maxes[k] = block[-1]
+                else:
+                    del self.blocks[k]
+                    del self.maxes[k]
+                return
+        raise ValueError(f"{x} is not in the set")
+    
+    def lower(self, x):
+        # Largest value < x, or None
+        k = bisect_left(self.maxes, x)
+        if k < len(self.blocks):
+            i = bisect_left(self.blocks[k], x)
+            if i:
+                return self.blocks[k][i - 1]
+        return self.maxes[k - 1] if k else None
+    
+    def floor(self, x):
+        # Largest value <= x, or None
+        k = bisect_right(self.maxes, x)
+        if k < len(self.blocks):
+            i = bisect_right(self.blocks[k], x)
+            if i:
+                return self.blocks[k][i - 1]
+        return self.maxes[k - 1] if k else None
+    
+    def higher(self, x):
+        # Smallest value > x, or None
+        k = bisect_right(self.maxes, x)
+        if k == len(self.blocks):
+            return None
+        block = self.blocks[k]
+        return block[bisect_right(block, x)]
+    
+    def ceiling(self, x):
+        # Smallest value >= x, or None
+        k = bisect_left(self.maxes, x)
+        if k == len(self.blocks):
+            return None
+        block = self.blocks[k]
+        return block[bisect_left(block, x)]
+
+
+class MinGapTracker:
+    # Minimum gap of a multiset under inserts and removals. Values live in a
+    # SortedBlocks multiset; gaps between neighbours sit in a heap and are
+    # discarded lazily once their endpoints stop being adjacent.
+    
+    def __init__(self, values=()):
+        self.values = SortedBlocks(values)
+        self.counts = {}
+        for x in self.values:
+            self.counts[x] = self.counts.get(x, 0) + 1
+        self._rebuild()
+    
+    def __len__(self):
+        return len(self.values)
+    
+    def _rebuild(self):
+        values = iter(self.values)
+        self.heap = []
+        previous = next(values, None)
+        for x in values:
+            self.heap.append((x - previous, previous, x))
+            previous = x
+        heapq.heapify(self.heap)
+    
+    def _compact(self):
+        # Stale entries pile up under any mix of updates
+        if len(self.heap) > 4 * len(self.values) + 16:
+            self._rebuild()
+    
+    def insert(self, x):
+        below = self.values.floor(x)
+        above = self.values.higher(x)
+        self.values.add(x)
+        self.counts[x] = self.counts.get(x, 0) + 1
+        if below is not None:
+            heapq.heappush(self.heap, (x - below, below, x))
+        if above is not None:
+            heapq.heappush(self.heap, (above - x, x, above))
+        self._compact()
+    
+    def remove(self, x):
+        if x not in self.counts:
+            raise ValueError(f"{x} is not tracked")
+        self.values.remove(x)
+        self.counts[x] -= 1
+        if self.counts[x] == 0:
+            del self.counts[x]
+        a = self.values.lower(x)
+        b = self.values.ceiling(x)
+        if a is not None and b is not None:
+            heapq.heappush(self.heap, (b - a, a, b))
+        self._compact()
+    
+    def _adjacent(self, a, b):
+        if a == b:
+            return self.counts.get(a, 0) >= 2
+        if a not in self.counts or b not in self.counts:
+            return False
+        return self.values.higher(a) == b
+    
+    def min_gap(self):
+        while self.heap and not self._adjacent(self.heap[0][1], self.heap[0][2]):
+            heapq.heappop(self.heap)
+        if not self.heap:
+            return float('inf'), None, None
+        return self.heap[0]
+
+
+
+if __name__ == "__main__":
+    arr = [7.2, 3.1, 9.8, 5.5, 4.9, 2.3]
+    arr.sort()
+    print("Sorted array:", arr)
+
+    min_diff = closest_pair_1d(arr, 0, len(arr) - 1)
+    print("Smallest distance (closest pair difference):", min_diff)
+    print("Smallest distance (explicit stack, no cutoff):", closest_pair_1d(arr, 0, len(arr) - 1, cutoff=0))
 
-arr = [7.2, 3.1, 9.8, 5.5, 4.9, 2.3]
-arr.sort()
-print("Sorted array:", arr)
+    timestamps = [17, 3, 42, 8, 29, 11, 36]
+    print("Unsorted timestamps:", timestamps)
+    print("Minimum gap (sort):", min_gap(timestamps))
+    print("Minimum gap (bucket):", min_gap(timestamps, mode="bucket"))
 
-min_diff = closest_pair_1d(arr, 0, len(arr) - 1)
-print("Smallest distance (closest pair difference):", min_diff)
+    tracker = MinGapTracker(timestamps)
+    tracker.insert(40)
+    print("After inserting 40:", tracker.min_gap())
+    tracker.remove(42)
+    print("After removing 42:", tracker.min_gap())
 
 
 #Time Complexity: O(n log n)
@@ -1,6 +1,44 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from instrumentation import active
+from workloads import worst_case_unimodal
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
 def find_peak_unimodal(A):
     left = 0
     right = len(A) - 1
+    
+    while left < right:
+        mid = (left + right) // 2
+        
+        if A[mid] < A[mid + 1]:
+            left = mid + 1
+        else:
+            right = mid
+    
+    return A[left], left
+
+
+def find_peak_unimodal_counted(A):
+    # Counting variant: returns (value, index, comparisons) and feeds the
+    # active Instrumentation, if any
+    stats = active()
+    if stats is not None:
+        with stats.timer("find_peak_unimodal"):
+            result = _find_peak_unimodal_counted(A)
+        stats.count("find_peak_unimodal comparisons", result[2])
+        return result
+    return _find_peak_unimodal_counted(A)
+
+
+def _find_peak_unimodal_counted(A):
+    left = 0
+    right = len(A) - 1
     comparisons = 0
     
     while left < right:
@@ -27,6 +65,202 @@ def create_unimodal_array(n, peak_position):
     return A
 
 
+def find_peak_unimodal_batch(arrays):
+    if np is None:
+        results = [find_peak_unimodal_counted(A) for A in arrays]
+        return ([r[0] for r in results], [r[1] for r in results],
+                [r[2] for r in results])
+
+    if isinstance(arrays, np.ndarray) and arrays.ndim == 2:
+        matrix = arrays
+        lengths = np.full(matrix.shape[0], matrix.shape[1], dtype=np.int64)
+    else:
+        arrays = [np.asarray(A) for A in arrays]
+        lengths = np.array([len(A) for A in arrays], dtype=np.int64)
+        # Ragged rows are padded into one matrix whose dtype fits every row
+        dtype = np.result_type(*{A.dtype for A in arrays}) if arrays else np.float64
+        matrix = np.zeros((len(arrays), int(lengths.max(initial=0))), dtype=dtype)
+        for row, A in enumerate(arrays):
+            matrix[row, :len(A)] = A
+
+    if matrix.shape[0] and not lengths.min():
+        raise ValueError(f"find_peak_unimodal_batch: array {int(lengths.argmin())} is empty")
+
+    rows = np.arange(matrix.shape[0])
+    left = np.zeros(matrix.shape[0], dtype=np.int64)
+    right = lengths - 1
+    comparisons = np.zeros(matrix.shape[0], dtype=np.int64)
+
+    active = left < right
+    while active.any():
+        r = rows[active]
+        mid = (left[r] + right[r]) // 2
+        comparisons[r] += 1
+
+        go_right = matrix[r, mid] < matrix[r, mid + 1]
+        left[r[go_right]] = mid[go_right] + 1
+        right[r[~go_right]] = mid[~go_right]
+
+        active = left < right
+
+    return matrix[rows, left], left, comparisons
+
+
+def create_unimodal_batch(n, peak_positions):
+    peaks = np.asarray(peak_positions, dtype=np.int64)[:, None]
+    i = np.arange(n, dtype=np.int64)[None, :]
+    return np.where(i <= peaks, i * 10 + 5, (2 * peaks - i) * 10 + 5)
+
+
+class ProbeCache:
+
+    def __init__(self, source, n=None, executor=None):
+        self.fetch = source if callable(source) else source.__getitem__
+        self.n = len(source) if n is None else n
+        self.executor = executor
+        self.cache = {}
+        self.pending = {}
+        self.probe_count = 0
+
+    def prefetch(self, *indices):
+        if self.executor is None:
+            return
+        for i in indices:
+            if 0 <= i < self.n and i not in self.cache and i not in self.pending:
+                self.probe_count += 1
+                self.pending[i] = self.executor.submit(self.fetch, i)
+
+    def __getitem__(self, i):
+        if i >= self.n:
+            return float('-inf')
+        if i not in self.cache:
+            if i in self.pending:
+                self.cache[i] = self.pending.pop(i).result()
+            else:
+                self.probe_count += 1
+                self.cache[i] = self.fetch(i)
+        return self.cache[i]
+
+
+def find_peak_lazy(source, n=None, mode="binary", workers=0):
+    executor = ThreadPoolExecutor(workers) if workers else None
+    A = ProbeCache(source, n, executor)
+    try:
+        if mode == "binary":
+            index = _binary_peak(A)
+        elif mode == "golden":
+            index = _golden_section_peak(A)
+        else:
+            raise ValueError(f"Unknown mode: {mode}")
+        return A[index], index, A.probe_count
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
+def _binary_peak(A):
+    left = 0
+    right = A.n - 1
+
+    while left < right:
+        mid = (left + right) // 2
+        right_mid = (mid + 1 + right) // 2
+        left_mid = (left + mid) // 2
+        A.prefetch(mid, mid + 1, right_mid, right_mid + 1, left_mid, left_mid + 1)
+
+        if A[mid] < A[mid + 1]:
+            left = mid + 1
+        else:
+            right = mid
+
+    return left
+
+
+def _golden_section_peak(A):
+    # Fibonacci form of golden-section search: the interval (low, low + fib[k])
+    # is probed at low + fib[k-2] and low + fib[k-1], and whichever side is kept,
+    # one of the two probes becomes an interior point of the next interval.
+    fib = [0, 1]
+    while fib[-1] < A.n + 1:
+        fib.append(fib[-1] + fib[-2])
+
+    low = -1
+    k = len(fib) - 1
+
+    while fib[k] > 2:
+        x1 = low + fib[k - 2]
+        x2 = low + fib[k - 1]
+        A.prefetch(x1, x2, low + fib[k - 3], x1 + fib[k - 2])
+
+        if A[x1] < A[x2]:
+            low = x1
+        k -= 1
+
+    return low + 1
+
+
+def open_grid(path, rows, cols, dtype="float64"):
+    return np.memmap(path, dtype=dtype, mode="r", shape=(rows, cols))
+
+
+def find_peak_2d(grid, kind="max"):
+    sign = 1 if kind == "max" else -1
+
+    if np is not None and isinstance(grid, np.ndarray):
+        rows, cols = grid.shape
+        row_segment = lambda i, c0, c1: grid[i, c0:c1 + 1].tolist()
+        col_segment = lambda j, r0, r1: grid[r0:r1 + 1, j].tolist()
+        cell = lambda i, j: grid[i, j].item()
+    else:
+        rows, cols = len(grid), len(grid[0])
+        row_segment = lambda i, c0, c1: grid[i][c0:c1 + 1]
+        col_segment = lambda j, r0, r1: [grid[i][j] for i in range(r0, r1 + 1)]
+        cell = lambda i, j: grid[i][j]
+
+    probes = 0
+    r0, r1, c0, c1 = 0, rows - 1, 0, cols - 1
+    best = None
+
+    while True:
+        mid_r = (r0 + r1) // 2
+        mid_c = (c0 + c1) // 2
+
+        # The window's cross (middle row and middle column) splits it into
+        # four quadrants; the best cell seen so far is always inside the window.
+        row_vals = row_segment(mid_r, c0, c1)
+        col_vals = col_segment(mid_c, r0, r1)
+        probes += len(row_vals) + len(col_vals)
+
+        candidates = [(sign * v, mid_r, c0 + k) for k, v in enumerate(row_vals)]
+        candidates += [(sign * v, r0 + k, mid_c) for k, v in enumerate(col_vals)]
+        if best is not None:
+            candidates.append(best)
+        value, i, j = max(candidates)
+
+        better = None
+        for ni, nj in ((i - 1, j), (i + 1, j), (i, j - 1), (i, j + 1)):
+            if 0 <= ni < rows and 0 <= nj < cols:
+                probes += 1
+                v = sign * cell(ni, nj)
+                if v > value and (better is None or v > better[0]):
+                    better = (v, ni, nj)
+
+        if better is None:
+            return sign * value, (i, j), probes
+
+        # A strictly larger neighbour cannot lie on the cross or outside the
+        # window, so it picks the quadrant that still contains a peak.
+        best = better
+        if better[1] < mid_r:
+            r1 = mid_r - 1
+        else:
+            r0 = mid_r + 1
+        if better[2] < mid_c:
+            c1 = mid_c - 1
+        else:
+            c0 = mid_c + 1
+
+
 def test_algorithm():
     
     print("=" * 60)
@@ -36,7 +270,7 @@ def test_algorithm():
     peak_pos1 = 6
     A1 = create_unimodal_array(n1, peak_pos1)
     print(f"Array: {A1}")
-    peak_val, peak_idx, comps = find_peak_unimodal(A1)
+    peak_val, peak_idx, comps = find_peak_unimodal_counted(A1)
     print(f"Peak found: {peak_val} at index {peak_idx}")
     print(f"Number of comparisons: {comps}")
     print(f"Theoretical maximum: O(log {n1}) ≈ {n1.bit_length() - 1} comparisons")
@@ -49,7 +283,7 @@ def test_algorithm():
     peak_pos2 = 3
     A2 = create_unimodal_array(n2, peak_pos2)
     print(f"Array: {A2}")
-    peak_val, peak_idx, comps = find_peak_unimodal(A2)
+    peak_val, peak_idx, comps = find_peak_unimodal_counted(A2)
     print(f"Peak found: {peak_val} at index {peak_idx}")
     print(f"Number of comparisons: {comps}")
     print(f"Theoretical maximum: O(log {n2}) ≈ {n2.bit_length() - 1} comparisons")
@@ -62,7 +296,7 @@ def test_algorithm():
     peak_pos3 = 12
     A3 = create_unimodal_array(n3, peak_pos3)
     print(f"Array: {A3}")
-    peak_val, peak_idx, comps = find_peak_unimodal(A3)
+    peak_val, peak_idx, comps = find_peak_unimodal_counted(A3)
     print(f"Peak found: {peak_val} at index {peak_idx}")
     print(f"Number of comparisons: {comps}")
     print(f"Theoretical maximum: O(log {n3}) ≈ {n3.bit_length() - 1} comparisons")
@@ -73,7 +307,7 @@ def test_algorithm():
     print("=" * 60)
     custom_array = [1, 3, 5, 7, 9, 11, 13, 15, 12, 10, 8, 6, 4, 2]
     print(f"Array: {custom_array}")
-    peak_val, peak_idx, comps = find_peak_unimodal(custom_array)
+    peak_val, peak_idx, comps = find_peak_unimodal_counted(custom_array)
     print(f"Peak found: {peak_val} at index {peak_idx}")
     print(f"Number of comparisons: {comps}")
     print(f"Theoretical maximum: O(log {len(custom_array)}) ≈ {len(custom_array).bit_length() - 1} comparisons")
@@ -84,7 +318,7 @@ def test_algorithm():
     print("=" * 60)
     A5 = create_unimodal_array(12, 0)
     print(f"Array: {A5}")
-    peak_val, peak_idx, comps = find_peak_unimodal(A5)
+    peak_val, peak_idx, comps = find_peak_unimodal_counted(A5)
     print(f"Peak found: {peak_val} at index {peak_idx}")
     print(f"Number of comparisons: {comps}")
     print()
@@ -95,11 +329,64 @@ def test_algorithm():
     n6 = 12
     A6 = create_unimodal_array(n6, n6-1)
     print(f"Array: {A6}")
-    peak_val, peak_idx, comps = find_peak_unimodal(A6)
+    peak_val, peak_idx, comps = find_peak_unimodal_counted(A6)
     print(f"Peak found: {peak_val} at index {peak_idx}")
     print(f"Number of comparisons: {comps}")
     print()
 
+    if np is not None:
+        print("=" * 60)
+        print("Test Case 7: Batch of 5 arrays of size 16, all peaks at once")
+        print("=" * 60)
+        peak_positions = [0, 3, 7, 12, 15]
+        batch = create_unimodal_batch(16, peak_positions)
+        peak_vals, peak_idxs, comps = find_peak_unimodal_batch(batch)
+        print(f"Expected peaks: {peak_positions}")
+        print(f"Peaks found at: {peak_idxs.tolist()}")
+        print(f"Peak values: {peak_vals.tolist()}")
+        print(f"Comparisons per array: {comps.tolist()}")
+        print()
+
+    print("=" * 60)
+    print("Test Case 8: Expensive probes (size 1000, peak at position 618)")
+    print("=" * 60)
+    A8 = create_unimodal_array(1000, 618)
+    evaluations = [0]
+
+    def expensive_probe(i):
+        evaluations[0] += 1
+        return A8[i]
+
+    for mode in ("binary", "golden"):
+        evaluations[0] = 0
+        peak_val, peak_idx, probes = find_peak_lazy(expensive_probe, len(A8), mode=mode)
+        print(f"{mode:>6}: Peak found: {peak_val} at index {peak_idx}, "
+              f"probes: {probes}, evaluations: {evaluations[0]}")
+    print()
+
+    print("=" * 60)
+    print("Test Case 9: 2D grid of size 100x100")
+    print("=" * 60)
+    grid = [[(i * 37 + j * 91) % 101 + (i * j) % 7 for j in range(100)] for i in range(100)]
+    peak_val, (peak_row, peak_col), probes = find_peak_2d(grid)
+    print(f"Peak found: {peak_val} at ({peak_row}, {peak_col})")
+    print(f"Number of probes: {probes} (full scan: {100 * 100})")
+    low_val, (low_row, low_col), probes = find_peak_2d(grid, kind="min")
+    print(f"Local minimum found: {low_val} at ({low_row}, {low_col}), probes: {probes}")
+    print()
+
+    print("=" * 60)
+    print("Test Case 10: Worst-case unimodal shapes (size 1000)")
+    print("=" * 60)
+    for name, A10 in worst_case_unimodal(1000).items():
+        expected = A10.index(max(A10))
+        peak_val, peak_idx, comparisons = find_peak_unimodal_counted(A10)
+        _, lazy_idx, probes = find_peak_lazy(A10, mode="golden")
+        print(f"{name:>13}: peak at index {peak_idx} (expected {expected}), "
+              f"comparisons: {comparisons}, golden-section probes: {probes}"
+              f"{'' if peak_idx == lazy_idx == expected else '  MISMATCH'}")
+    print()
+
 
 if __name__ == "__main__":
     print("\n" + "="*60)
@@ -1,67 +1,119 @@
-def find_best_transaction(prices):
+import mmap
+
+from divide_conquer import DivideAndConquer, run
+from instrumentation import active
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def combine_summaries(left_result, right_result):
+    (left_buy, left_sell, left_profit, 
+     left_min_price, left_min_day, left_max_price, left_max_day) = left_result
+    
+    (right_buy, right_sell, right_profit,
+     right_min_price, right_min_day, right_max_price, right_max_day) = right_result
+    
+    cross_profit = right_max_price - left_min_price
+    cross_buy = left_min_day
+    cross_sell = right_max_day
+    
+    best_profit = left_profit
+    best_buy = left_buy
+    best_sell = left_sell
+    
+    if right_profit > best_profit:
+        best_profit = right_profit
+        best_buy = right_buy
+        best_sell = right_sell
+    
+    if cross_profit > best_profit:
+        best_profit = cross_profit
+        best_buy = cross_buy
+        best_sell = cross_sell
+    
+    if left_min_price <= right_min_price:
+        min_price = left_min_price
+        min_day = left_min_day
+    else:
+        min_price = right_min_price
+        min_day = right_min_day
+    
+    if left_max_price >= right_max_price:
+        max_price = left_max_price
+        max_day = left_max_day
+    else:
+        max_price = right_max_price
+        max_day = right_max_day
+    
+    return (best_buy, best_sell, best_profit, 
+            min_price, min_day, max_price, max_day)
+
+
+def find_best_transaction(prices, cutoff=64, workers=0):
     n = len(prices)
     if n < 2:
+        return None, None, 0
+    
+    result = run(BestTransactionAlgorithm(), (prices, 0, n - 1), cutoff, workers)
+    buy_day, sell_day, max_profit = result[0], result[1], result[2]
+    
+    if buy_day is not None:
+        buy_day += 1
+        sell_day += 1
+    
+    return buy_day, sell_day, max_profit
+
+
+def _summarize_range(prices, left, right):
+    if left == right:
+        return (None, None, 0, prices[left], left, prices[left], left)
+    
+    mid = (left + right) // 2
+    
+    left_result = _summarize_range(prices, left, mid)
+    right_result = _summarize_range(prices, mid + 1, right)
+    
+    return combine_summaries(left_result, right_result)
+
+
+def find_best_transaction_counted(prices):
+    # Counting variant: returns (buy_day, sell_day, profit, comparisons) and
+    # feeds the active Instrumentation, if any
+    if len(prices) < 2:
         return None, None, 0, 0
     
+    stats = active()
+    if stats is not None:
+        with stats.timer("find_best_transaction"):
+            result = _find_best_transaction_counted(prices, stats)
+        stats.count("find_best_transaction comparisons", result[3])
+        return result
+    return _find_best_transaction_counted(prices)
+
+
+def _find_best_transaction_counted(prices, stats=None):
+    n = len(prices)
     comparisons = [0]
     
-    def divide_conquer(left, right):
+    def divide_conquer(left, right, depth):
+        if stats is not None:
+            stats.record_depth("find_best_transaction", depth)
         if left == right:
-            comparisons[0] += 0
             return (None, None, 0, prices[left], left, prices[left], left)
         
         mid = (left + right) // 2
         
-        left_result = divide_conquer(left, mid)
-        right_result = divide_conquer(mid + 1, right)
-        
-        (left_buy, left_sell, left_profit, 
-         left_min_price, left_min_day, left_max_price, left_max_day) = left_result
-        
-        (right_buy, right_sell, right_profit,
-         right_min_price, right_min_day, right_max_price, right_max_day) = right_result
-        
-        comparisons[0] += 1
-        cross_profit = right_max_price - left_min_price
-        cross_buy = left_min_day
-        cross_sell = right_max_day
-        
-        best_profit = left_profit
-        best_buy = left_buy
-        best_sell = left_sell
+        left_result = divide_conquer(left, mid, depth + 1)
+        right_result = divide_conquer(mid + 1, right, depth + 1)
         
-        comparisons[0] += 1
-        if right_profit > best_profit:
-            best_profit = right_profit
-            best_buy = right_buy
-            best_sell = right_sell
-        
-        comparisons[0] += 1
-        if cross_profit > best_profit:
-            best_profit = cross_profit
-            best_buy = cross_buy
-            best_sell = cross_sell
-        
-        comparisons[0] += 1
-        if left_min_price <= right_min_price:
-            min_price = left_min_price
-            min_day = left_min_day
-        else:
-            min_price = right_min_price
-            min_day = right_min_day
-        
-        comparisons[0] += 1
-        if left_max_price >= right_max_price:
-            max_price = left_max_price
-            max_day = left_max_day
-        else:
-            max_price = right_max_price
-            max_day = right_max_day
-        
-        return (best_buy, best_sell, best_profit, 
-                min_price, min_day, max_price, max_day)
+        # combine_summaries makes exactly five comparisons
+        comparisons[0] += 5
+        return combine_summaries(left_result, right_result)
     
-    result = divide_conquer(0, n - 1)
+    result = divide_conquer(0, n - 1, 0)
     buy_day, sell_day, max_profit = result[0], result[1], result[2]
     
     if buy_day is not None:
@@ -99,6 +151,264 @@ def find_best_transaction_optimized(prices):
         return None, None, 0
 
 
+def find_best_transaction_streaming(ticks):
+    ticks = iter(ticks)
+    try:
+        min_price = next(ticks)
+    except StopIteration:
+        return None, None, 0
+
+    min_day = 0
+    max_profit = 0
+    best_buy = 0
+    best_sell = 0
+
+    for i, price in enumerate(ticks, 1):
+        profit = price - min_price
+
+        if profit > max_profit:
+            max_profit = profit
+            best_buy = min_day
+            best_sell = i
+
+        if price < min_price:
+            min_price = price
+            min_day = i
+
+    if max_profit > 0:
+        return best_buy + 1, best_sell + 1, max_profit
+    else:
+        return None, None, 0
+
+
+def read_ticks(path, typecode="d"):
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm).cast(typecode)
+            try:
+                yield from view
+            finally:
+                view.release()
+
+
+def read_tick_matrix(path, n_tickers, dtype="float64", chunk_rows=1 << 16):
+    matrix = np.memmap(path, dtype=dtype, mode="r").reshape(-1, n_tickers)
+    for start in range(0, matrix.shape[0], chunk_rows):
+        yield matrix[start:start + chunk_rows]
+
+
+def find_best_transactions_matrix(chunks):
+    # Each column is one ticker and each row one day. `chunks` is either a
+    # full (days x tickers) matrix or an iterable of consecutive row blocks.
+    # Day numbers are 1-based as in find_best_transaction; 0 means no
+    # profitable transaction for that ticker.
+    if isinstance(chunks, np.ndarray):
+        chunks = [chunks]
+
+    min_price = None
+    offset = 0
+
+    for chunk in chunks:
+        chunk = np.asarray(chunk)
+        rows = chunk.shape[0]
+        if rows == 0:
+            continue
+        days = np.arange(offset, offset + rows)[:, None]
+
+        if min_price is None:
+            min_price = chunk[0].copy()
+            min_day = np.zeros(chunk.shape[1], dtype=np.int64)
+            max_profit = np.zeros(chunk.shape[1], dtype=chunk.dtype)
+            best_buy = np.zeros(chunk.shape[1], dtype=np.int64)
+            best_sell = np.zeros(chunk.shape[1], dtype=np.int64)
+
+        running_min = np.minimum.accumulate(np.vstack([min_price, chunk]), axis=0)
+        new_min = chunk < running_min[:-1]
+        running_min_day = np.maximum.accumulate(
+            np.vstack([min_day, np.where(new_min, days, -1)]), axis=0)
+
+        profits = chunk - running_min[:-1]
+        sell = np.argmax(profits, axis=0)
+        cols = np.arange(chunk.shape[1])
+        chunk_profit = profits[sell, cols]
+
+        better = chunk_profit > max_profit
+        max_profit[better] = chunk_profit[better]
+        best_buy[better] = running_min_day[sell, cols][better]
+        best_sell[better] = offset + sell[better]
+
+        min_price = running_min[-1]
+        min_day = running_min_day[-1]
+        offset += rows
+
+    if min_price is None:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+
+    profitable = max_profit > 0
+    return (np.where(profitable, best_buy + 1, 0),
+            np.where(profitable, best_sell + 1, 0),
+            max_profit)
+
+
+def max_profit(prices, k=None, fee=0, cooldown=False):
+    # k=None allows unlimited transactions. State j tracks the best cash
+    # after at most j completed transactions (free) or while holding the
+    # j-th share (hold); with cooldown a buy may only use the cash from
+    # two days earlier.
+    levels = 1 if k is None else k
+    shift = 0 if k is None else 1
+
+    hold = [float('-inf')] * (levels + 1)
+    free = [0] * (levels + 1)
+    free_before = free
+
+    for price in prices:
+        base = free_before if cooldown else free
+        new_hold = [float('-inf')] + [max(hold[j], base[j - shift] - price)
+                                      for j in range(1, levels + 1)]
+        new_free = [0] + [max(free[j], hold[j] + price - fee)
+                          for j in range(1, levels + 1)]
+        free_before = free
+        hold, free = new_hold, new_free
+
+    return max(free)
+
+
+def max_profits_matrix(chunks, k=None, fee=0, cooldown=False):
+    # Same state machine as max_profit, one column per ticker; `chunks`
+    # follows find_best_transactions_matrix and `fee` may be per-ticker.
+    if isinstance(chunks, np.ndarray):
+        chunks = [chunks]
+
+    levels = 1 if k is None else k
+    shift = 0 if k is None else 1
+    hold = None
+
+    for chunk in chunks:
+        chunk = np.asarray(chunk, dtype=np.float64)
+        if hold is None:
+            hold = np.full((levels + 1, chunk.shape[1]), -np.inf)
+            free = np.zeros((levels + 1, chunk.shape[1]))
+            free_before = free
+
+        for row in chunk:
+            base = free_before if cooldown else free
+            new_hold = hold.copy()
+            new_free = free.copy()
+            new_hold[1:] = np.maximum(hold[1:], base[1 - shift:levels + 1 - shift] - row)
+            new_free[1:] = np.maximum(free[1:], hold[1:] + row - fee)
+            free_before = free
+            hold, free = new_hold, new_free
+
+    if hold is None:
+        return np.zeros(0)
+    return free.max(axis=0)
+
+
+class TransactionIndex:
+
+    def __init__(self, prices=()):
+        self.n = 0
+        self.capacity = 1
+        self.tree = [None] * 2
+        for price in prices:
+            self.append(price)
+
+    def __len__(self):
+        return self.n
+
+    def _combine(self, left, right):
+        if left is None:
+            return right
+        if right is None:
+            return left
+        return combine_summaries(left, right)
+
+    def _grow(self):
+        leaves = self.tree[self.capacity:self.capacity + self.n]
+        self.capacity *= 2
+        self.tree = [None] * (2 * self.capacity)
+        self.tree[self.capacity:self.capacity + self.n] = leaves
+        for node in range(self.capacity - 1, 0, -1):
+            self.tree[node] = self._combine(self.tree[2 * node], self.tree[2 * node + 1])
+
+    def append(self, price):
+        if self.n == self.capacity:
+            self._grow()
+
+        day = self.n
+        node = self.capacity + day
+        self.tree[node] = (None, None, 0, price, day, price, day)
+        self.n += 1
+
+        node //= 2
+        while node:
+            self.tree[node] = self._combine(self.tree[2 * node], self.tree[2 * node + 1])
+            node //= 2
+
+    def best_transaction(self, first_day, last_day):
+        # Days are 1-based and inclusive, matching find_best_transaction.
+        lo = self.capacity + first_day - 1
+        hi = self.capacity + last_day
+        left_summary = None
+        right_summary = None
+
+        while lo < hi:
+            if lo & 1:
+                left_summary = self._combine(left_summary, self.tree[lo])
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                right_summary = self._combine(self.tree[hi], right_summary)
+            lo //= 2
+            hi //= 2
+
+        result = self._combine(left_summary, right_summary)
+        if result is None or result[0] is None:
+            return None, None, 0
+        return result[0] + 1, result[1] + 1, result[2]
+
+
+class BestTransactionAlgorithm(DivideAndConquer):
+    
+    def size(self, problem):
+        prices, low, high = problem
+        return high - low + 1
+    
+    def is_base(self, problem):
+        prices, low, high = problem
+        return low == high
+    
+    def base(self, problem):
+        prices, low, high = problem
+        return (None, None, 0, prices[low], low, prices[low], low)
+    
+    def sequential(self, problem):
+        return _summarize_range(*problem)
+    
+    def divide(self, problem):
+        prices, low, high = problem
+        mid = (low + high) // 2
+        return [(prices, low, mid), (prices, mid + 1, high)]
+    
+    def combine(self, problem, results):
+        return combine_summaries(*results)
+    
+    def scatter(self, problem):
+        prices, low, high = problem
+        return prices[low:high + 1], 0, high - low
+    
+    def gather(self, problem, result):
+        # Days in a scattered slice are relative to its first day
+        offset = problem[1]
+        buy, sell, profit, min_price, min_day, max_price, max_day = result
+        if buy is not None:
+            buy += offset
+            sell += offset
+        return (buy, sell, profit, min_price, min_day + offset,
+                max_price, max_day + offset)
+
+
 def test_stock_algorithm():
     
     print("=" * 70)
@@ -112,7 +422,7 @@ def test_stock_algorithm():
     prices1 = [9, 1, 5]
     print(f"Days:   {list(range(1, len(prices1) + 1))}")
     print(f"Prices: {prices1}")
-    buy, sell, profit, comps = find_best_transaction(prices1)
+    buy, sell, profit, comps = find_best_transaction_counted(prices1)
     if buy:
         print(f"Result: Buy on day {buy}, sell on day {sell}")
         print(f"Profit per share: ${profit}")
@@ -128,7 +438,7 @@ def test_stock_algorithm():
     prices2 = [10, 9, 8, 7, 6, 5, 4, 3, 2, 1]
     print(f"Days:   {list(range(1, len(prices2) + 1))}")
     print(f"Prices: {prices2}")
-    buy, sell, profit, comps = find_best_transaction(prices2)
+    buy, sell, profit, comps = find_best_transaction_counted(prices2)
     if buy:
         print(f"Result: Buy on day {buy}, sell on day {sell}")
         print(f"Profit per share: ${profit}")
@@ -144,7 +454,7 @@ def test_stock_algorithm():
     prices3 = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
     print(f"Days:   {list(range(1, len(prices3) + 1))}")
     print(f"Prices: {prices3}")
-    buy, sell, profit, comps = find_best_transaction(prices3)
+    buy, sell, profit, comps = find_best_transaction_counted(prices3)
     if buy:
         print(f"Result: Buy on day {buy}, sell on day {sell}")
         print(f"Profit per share: ${profit}")
@@ -160,7 +470,7 @@ def test_stock_algorithm():
     prices4 = [100, 80, 60, 40, 20, 30, 50, 70, 90, 110, 100, 90]
     print(f"Days:   {list(range(1, len(prices4) + 1))}")
     print(f"Prices: {prices4}")
-    buy, sell, profit, comps = find_best_transaction(prices4)
+    buy, sell, profit, comps = find_best_transaction_counted(prices4)
     if buy:
         print(f"Result: Buy on day {buy}, sell on day {sell}")
         print(f"Profit per share: ${profit}")
@@ -176,7 +486,7 @@ def test_stock_algorithm():
     prices5 = [5, 15, 3, 10, 2, 20, 1, 8]
     print(f"Days:   {list(range(1, len(prices5) + 1))}")
     print(f"Prices: {prices5}")
-    buy, sell, profit, comps = find_best_transaction(prices5)
+    buy, sell, profit, comps = find_best_transaction_counted(prices5)
     if buy:
         print(f"Result: Buy on day {buy}, sell on day {sell}")
         print(f"Profit per share: ${profit}")
@@ -193,7 +503,7 @@ def test_stock_algorithm():
                53, 50, 48, 44, 40, 38, 42, 48, 55, 60]
     print(f"Days:   {list(range(1, len(prices6) + 1))}")
     print(f"Prices: {prices6}")
-    buy, sell, profit, comps = find_best_transaction(prices6)
+    buy, sell, profit, comps = find_best_transaction_counted(prices6)
     if buy:
         print(f"Result: Buy on day {buy}, sell on day {sell}")
         print(f"Profit per share: ${profit}")
@@ -211,7 +521,7 @@ def test_stock_algorithm():
     
     test_prices = [100, 80, 60, 40, 20, 30, 50, 70, 90, 110, 100, 90]
     
-    buy_dc, sell_dc, profit_dc, comps_dc = find_best_transaction(test_prices)
+    buy_dc, sell_dc, profit_dc, comps_dc = find_best_transaction_counted(test_prices)
     buy_linear, sell_linear, profit_linear = find_best_transaction_optimized(test_prices)
     
     print(f"Test Array: {test_prices}")
@@ -228,6 +538,50 @@ def test_stock_algorithm():
     print("while the linear approach is more efficient for this specific problem.")
     print()
 
+    buy_stream, sell_stream, profit_stream = find_best_transaction_streaming(iter(test_prices))
+    print(f"Streaming Solution (one pass over an iterator):")
+    print(f"  Buy day {buy_stream}, sell day {sell_stream}, profit ${profit_stream}")
+    print()
+
+    index = TransactionIndex(test_prices)
+    print(f"Range Queries (segment tree over the divide & conquer summaries):")
+    for first_day, last_day in [(1, 5), (3, 9), (9, 12)]:
+        buy, sell, profit = index.best_transaction(first_day, last_day)
+        print(f"  Days {first_day}-{last_day}: buy day {buy}, sell day {sell}, profit ${profit}")
+    index.append(130)
+    buy, sell, profit = index.best_transaction(1, len(index))
+    print(f"  After appending day {len(index)} at $130: buy day {buy}, sell day {sell}, profit ${profit}")
+    print()
+
+    print("=" * 70)
+    print("MULTIPLE TRANSACTIONS, FEES AND COOLDOWN (O(n k) dynamic programming)")
+    print("=" * 70)
+    print()
+    print(f"Prices: {prices5}")
+    print(f"  At most 1 transaction:      ${max_profit(prices5, k=1)}")
+    print(f"  At most 2 transactions:     ${max_profit(prices5, k=2)}")
+    print(f"  Unlimited transactions:     ${max_profit(prices5)}")
+    print(f"  Unlimited, $3 fee per sale: ${max_profit(prices5, fee=3)}")
+    print(f"  Unlimited, 1-day cooldown:  ${max_profit(prices5, cooldown=True)}")
+    print()
+
+    if np is not None:
+        print("=" * 70)
+        print("MULTIPLE TICKERS: one column per ticker, solved together")
+        print("=" * 70)
+        print()
+        tickers = np.array([prices4, prices4[::-1], prices6[:12]]).T
+        buys, sells, profits = find_best_transactions_matrix(tickers)
+        for k in range(tickers.shape[1]):
+            if buys[k]:
+                print(f"Ticker {k + 1}: Buy day {buys[k]}, sell day {sells[k]}, profit ${profits[k]}")
+            else:
+                print(f"Ticker {k + 1}: No profitable transaction possible")
+        print()
+        profits_k2 = max_profits_matrix(tickers, k=2)
+        print(f"At most 2 transactions per ticker: {profits_k2.tolist()}")
+        print()
+
 
 def explain_algorithm():
     print("=" * 70)
@@ -1,3 +1,18 @@
+import asyncio
+import math
+import mmap
+import os
+import tempfile
+import time
+from array import array
+from collections import OrderedDict
+from itertools import islice
+
+from external_sort import external_sort, write_records
+from instrumentation import active
+from workloads import median_split_databases, skewed_databases
+
+
 class Database:
     
     def __init__(self, values, name):
@@ -18,7 +33,76 @@ class Database:
         self.query_count = 0
 
 
+class MappedDatabase:
+    
+    __slots__ = ("name", "query_count", "values", "_file", "_mmap")
+    
+    def __init__(self, path, name, typecode="q"):
+        self.name = name
+        self.query_count = 0
+        self._file = open(path, "rb")
+        # An empty file cannot be mapped; it becomes an empty view instead
+        if os.fstat(self._file.fileno()).st_size:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.values = memoryview(self._mmap).cast(typecode)
+        else:
+            self._mmap = None
+            self.values = memoryview(array(typecode))
+    
+    @classmethod
+    def create(cls, path, values, name, typecode="q", presorted=False,
+               chunk_size=1 << 20, tmpdir=None):
+        # Unsorted input is never sorted whole in memory: it is cut into sorted
+        # runs of `chunk_size` values, spilled to a scratch directory (next to
+        # `path` unless `tmpdir` is given) and k-way merged into the output, so
+        # memory stays O(chunk_size) however large the database is.
+        if presorted:
+            with open(path, "wb") as f:
+                write_records(f, values, typecode, chunk_size)
+            return cls(path, name, typecode)
+        
+        values = iter(values)
+        runs = iter(lambda: array(typecode, sorted(islice(values, chunk_size))), array(typecode))
+        workdir = tmpdir if tmpdir is not None else os.path.dirname(os.path.abspath(path))
+        external_sort(runs, path, typecode, chunk_size, tmpdir=workdir)
+        return cls(path, name, typecode)
+    
+    def query(self, k):
+        self.query_count += 1
+        if k < 1 or k > len(self.values):
+            return None
+        return self.values[k - 1]
+    
+    def size(self):
+        return len(self.values)
+    
+    def reset_count(self):
+        self.query_count = 0
+    
+    def close(self):
+        self.values.release()
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+
 def find_median_two_databases(db1, db2):
+    stats = active()
+    if stats is not None:
+        with stats.timer("find_median_two_databases"):
+            median, queries = _find_median_two_databases(db1, db2)
+        stats.count("find_median_two_databases queries", queries)
+        return median, queries
+    return _find_median_two_databases(db1, db2)
+
+
+def _find_median_two_databases(db1, db2):
     n = db1.size()
     
     db1.reset_count()
@@ -63,10 +147,150 @@ def find_median_two_databases(db1, db2):
     return None, db1.query_count + db2.query_count
 
 
+class RemoteDatabase(Database):
+    
+    def __init__(self, values, name, latency=0.0):
+        super().__init__(values, name)
+        self.latency = latency
+    
+    async def fetch(self, k):
+        await asyncio.sleep(self.latency)
+        return self.query(k)
+
+
+class CachedDatabase:
+    
+    def __init__(self, db, cache_size=128):
+        self.db = db
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self.latency = 0.0
+    
+    async def query(self, k):
+        if k in self.cache:
+            self.hits += 1
+            self.cache.move_to_end(k)
+            return self.cache[k]
+        
+        self.misses += 1
+        start = time.perf_counter()
+        value = await self.db.fetch(k)
+        self.latency += time.perf_counter() - start
+        
+        self.cache[k] = value
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return value
+    
+    def size(self):
+        return self.db.size()
+
+
+async def find_median_two_databases_async(db1, db2):
+    n = db1.size()
+    start = time.perf_counter()
+    
+    async def boundary(db, k):
+        if k == 0:
+            return float('-inf')
+        if k == n + 1:
+            return float('inf')
+        return await db.query(k)
+    
+    left = 0
+    right = n
+    median = None
+    
+    while left <= right:
+        i = (left + right) // 2
+        j = n - i
+        
+        db1_left, db1_right, db2_left, db2_right = await asyncio.gather(
+            boundary(db1, i), boundary(db1, i + 1),
+            boundary(db2, j), boundary(db2, j + 1))
+        
+        if db1_left <= db2_right and db2_left <= db1_right:
+            median = max(db1_left, db2_left)
+            break
+        elif db1_left > db2_right:
+            right = i - 1
+        else:
+            left = i + 1
+    
+    metrics = {
+        "queries": db1.misses + db2.misses,
+        "cache_hits": db1.hits + db2.hits,
+        "query_latency": db1.latency + db2.latency,
+        "wall_time": time.perf_counter() - start,
+    }
+    return median, metrics
+
+
+def kth_smallest(dbs, k, cache=None):
+    if cache is None:
+        cache = {}
+    sizes = [db.size() for db in dbs]
+    if k < 1 or k > sum(sizes):
+        return None
+    
+    def probe(d, pos):
+        if pos > sizes[d]:
+            return float('inf')
+        if (d, pos) not in cache:
+            cache[(d, pos)] = dbs[d].query(pos)
+        return cache[(d, pos)]
+    
+    m = len(dbs)
+    start = [0] * m
+    
+    # Probe the t-th remaining value of every database. At most t values of the
+    # database with the smallest probe, and t - 1 of each other one, are at or
+    # below that probe, so while m*t - m + 1 < k its first t values are all
+    # among the k - 1 smallest and can be discarded. Keeping t a power of two
+    # that only halves lets the unchanged probes come from the cache.
+    t = 1
+    while m * (2 * t) - m + 1 < k:
+        t *= 2
+    
+    while k > 1:
+        while m * t - m + 1 >= k:
+            t //= 2
+        
+        d = min(range(m), key=lambda i: (probe(i, start[i] + t), i))
+        start[d] += t
+        k -= t
+    
+    return min(probe(i, start[i] + 1) for i in range(m))
+
+
+def median_of_databases(dbs, cache=None):
+    total = sum(db.size() for db in dbs)
+    return kth_smallest(dbs, (total + 1) // 2, cache)
+
+
+def quantiles_of_databases(dbs, qs, cache=None):
+    if cache is None:
+        cache = {}
+    total = sum(db.size() for db in dbs)
+    return [kth_smallest(dbs, max(1, math.ceil(q * total)), cache) for q in qs]
+
+
 def verify_median(db1, db2, median):
-    all_values = sorted(db1.values + db2.values)
-    n = len(db1.values)
-    actual_median = all_values[n - 1]
+    values1 = db1.values
+    values2 = db2.values
+    n = len(values1)
+    
+    i = j = 0
+    actual_median = None
+    for _ in range(n):
+        if j == len(values2) or (i < n and values1[i] <= values2[j]):
+            actual_median = values1[i]
+            i += 1
+        else:
+            actual_median = values2[j]
+            j += 1
     
     return median == actual_median
 
@@ -232,6 +456,89 @@ def test_median_algorithm():
     print(f"Theoretical Max: O(log n) = O(log {len(values1)}) ≈ {len(values1).bit_length()}")
     print(f"Verification: {'✓ CORRECT' if is_correct else '✗ INCORRECT'}")
     print()
+    
+    print("=" * 75)
+    print("Test Case 7: Remote Databases with 20 ms Latency per Query (n=1000)")
+    print("=" * 75)
+    remote1 = CachedDatabase(RemoteDatabase(values1, "DB1", latency=0.02))
+    remote2 = CachedDatabase(RemoteDatabase(values2, "DB2", latency=0.02))
+    
+    median, metrics = asyncio.run(find_median_two_databases_async(remote1, remote2))
+    is_correct = verify_median(db1, db2, median)
+    
+    print(f"Algorithm Result: {median}")
+    print(f"Remote Queries: {metrics['queries']} (cache hits: {metrics['cache_hits']})")
+    print(f"Summed Query Latency: {metrics['query_latency'] * 1000:.0f} ms")
+    print(f"Wall Time (concurrent queries): {metrics['wall_time'] * 1000:.0f} ms")
+    print(f"Verification: {'✓ CORRECT' if is_correct else '✗ INCORRECT'}")
+    print()
+    
+    print("=" * 75)
+    print("Test Case 8: 8 Databases of Uneven Sizes (k-th smallest, median, quartiles)")
+    print("=" * 75)
+    sizes = [5, 1000, 37, 250, 1, 640, 90, 3000]
+    all_vals = list(range(1, sum(sizes) + 1))
+    random.shuffle(all_vals)
+    shards = []
+    offset = 0
+    for i, size in enumerate(sizes):
+        shards.append(Database(all_vals[offset:offset + size], f"DB{i + 1}"))
+        offset += size
+    
+    print(f"Database sizes: {sizes} (total {sum(sizes)})")
+    cache = {}
+    k = 2021
+    result = kth_smallest(shards, k, cache)
+    print(f"{k}th smallest: {result} (expected {k})")
+    print(f"Queries: {sum(db.query_count for db in shards)}")
+    result = median_of_databases(shards, cache)
+    print(f"Median: {result} (expected {(sum(sizes) + 1) // 2})")
+    print(f"Quartiles: {quantiles_of_databases(shards, [0.25, 0.5, 0.75], cache)}")
+    print(f"Total queries with shared cache: {sum(db.query_count for db in shards)}")
+    print()
+    
+    print("=" * 75)
+    print("Test Case 9: Memory-Mapped Databases on Disk (n=1,000,000)")
+    print("=" * 75)
+    n = 1_000_000
+    with tempfile.TemporaryDirectory() as folder:
+        path1 = os.path.join(folder, "db1.bin")
+        path2 = os.path.join(folder, "db2.bin")
+        with MappedDatabase.create(path1, range(0, 2 * n, 2), "DB1", presorted=True) as db1, \
+             MappedDatabase.create(path2, range(1, 2 * n, 2), "DB2", presorted=True) as db2:
+            print(f"Database 1: {db1.size()} even values in {path1}")
+            print(f"Database 2: {db2.size()} odd values in {path2}")
+            
+            median, queries = find_median_two_databases(db1, db2)
+            is_correct = verify_median(db1, db2, median)
+            
+            print(f"Algorithm Result: {median}")
+            print(f"Total Queries: {queries} (DB1: {db1.query_count}, DB2: {db2.query_count})")
+            print(f"Verification (streaming merge): {'✓ CORRECT' if is_correct else '✗ INCORRECT'}")
+    print()
+    
+    print("=" * 75)
+    print("Test Case 10: Skewed Splits Around the Median (n=1000)")
+    print("=" * 75)
+    for split in (0.0, 0.001, 0.5, 0.999, 1.0):
+        values1, values2 = median_split_databases(1000, split, seed=10)
+        db1, db2 = Database(values1, "DB1"), Database(values2, "DB2")
+        median, queries = find_median_two_databases(db1, db2)
+        is_correct = verify_median(db1, db2, median)
+        print(f"{split:>6.1%} of DB1 below the median: {median}, {queries} queries, "
+              f"{'✓ CORRECT' if is_correct else '✗ INCORRECT'}")
+    
+    for ratios in ((1, 1000), (1, 1, 1000), (1000, 1, 1)):
+        for overlap in (True, False):
+            values = skewed_databases(20_000, ratios, overlap=overlap, seed=10)
+            shards = [Database(v, f"DB{i + 1}") for i, v in enumerate(values)]
+            merged = sorted(v for db in shards for v in db.values)
+            result = median_of_databases(shards)
+            expected = merged[(len(merged) - 1) // 2]
+            print(f"Sizes {[db.size() for db in shards]} ({'overlapping' if overlap else 'disjoint'}): "
+                  f"median {result}, {sum(db.query_count for db in shards)} queries, "
+                  f"{'✓ CORRECT' if result == expected else '✗ INCORRECT'}")
+    print()
 
 
 def explain_algorithm():
@@ -1,6 +1,14 @@
+import os
+import random
+import tempfile
+from array import array
+
+from QuestionC import ELEMENT_BYTES, count_cross_inversions, count_inversions_external
+from instrumentation import active
+from workloads import near_reverse_sorted, near_sorted, random_permutation, reverse_sorted, sorted_permutation
+
+
 def count_significant_inversions(arr):
-    comparisons = [0]
-    
     def merge_count(arr):
         n = len(arr)
         
@@ -14,29 +22,77 @@ def count_significant_inversions(arr):
         left_count, left_sorted = merge_count(left)
         right_count, right_sorted = merge_count(right)
         
-        cross_count = count_cross_inversions(left_sorted, right_sorted, comparisons)
+        cross_count = count_cross_inversions(left_sorted, right_sorted, 2)
         
-        merged = merge(left_sorted, right_sorted, comparisons)
+        merged = merge(left_sorted, right_sorted)
         
         total_count = left_count + right_count + cross_count
         
         return total_count, merged
     
-    def count_cross_inversions(left, right, comp_counter):
-        count = 0
-        j = 0
+    def merge(left, right):
+        merged = []
+        i = j = 0
         
-        for i in range(len(left)):
-            while j < len(right) and left[i] > 2 * right[j]:
-                comp_counter[0] += 1
+        while i < len(left) and j < len(right):
+            if left[i] <= right[j]:
+                merged.append(left[i])
+                i += 1
+            else:
+                merged.append(right[j])
                 j += 1
-            
-            count += j
-            
-            if j < len(right):
-                comp_counter[0] += 1
         
-        return count
+        merged.extend(left[i:])
+        merged.extend(right[j:])
+        
+        return merged
+    
+    return merge_count(arr.copy())
+
+
+def count_significant_inversions_external(path, typecode="q", memory_limit=64 << 20, tmpdir=None):
+    # Out-of-core version for binary files larger than memory; see
+    # count_inversions_external in QuestionC
+    return count_inversions_external(path, typecode, memory_limit, factor=2, tmpdir=tmpdir)
+
+
+def count_significant_inversions_counted(arr):
+    # Counting variant: returns (count, sorted, comparisons) and feeds the
+    # active Instrumentation, if any
+    stats = active()
+    if stats is not None:
+        with stats.timer("count_significant_inversions"):
+            result = _count_significant_inversions_counted(arr, stats)
+        stats.count("count_significant_inversions comparisons", result[2])
+        return result
+    return _count_significant_inversions_counted(arr)
+
+
+def _count_significant_inversions_counted(arr, stats=None):
+    comparisons = [0]
+    
+    def merge_count(arr, depth):
+        if stats is not None:
+            stats.record_depth("count_significant_inversions", depth)
+        n = len(arr)
+        
+        if n <= 1:
+            return 0, arr
+        
+        mid = n // 2
+        left = arr[:mid]
+        right = arr[mid:]
+        
+        left_count, left_sorted = merge_count(left, depth + 1)
+        right_count, right_sorted = merge_count(right, depth + 1)
+        
+        cross_count = count_cross_inversions(left_sorted, right_sorted, 2, comparisons)
+        
+        merged = merge(left_sorted, right_sorted, comparisons)
+        
+        total_count = left_count + right_count + cross_count
+        
+        return total_count, merged
     
     def merge(left, right, comp_counter):
         merged = []
@@ -56,7 +112,7 @@ def count_significant_inversions(arr):
         
         return merged
     
-    count, sorted_arr = merge_count(arr.copy())
+    count, sorted_arr = merge_count(arr.copy(), 0)
     return count, sorted_arr, comparisons[0]
 
 
@@ -110,7 +166,7 @@ def test_significant_inversions():
         print(f"  ({i}, {j}): {ai} > 2*{aj} = {2*aj} ✓")
     print()
     
-    count_dc, sorted_arr, comps = count_significant_inversions(arr1)
+    count_dc, sorted_arr, comps = count_significant_inversions_counted(arr1)
     count_naive = count_significant_inversions_naive(arr1)
     
     print(f"Divide & Conquer Result: {count_dc} significant inversions")
@@ -126,7 +182,7 @@ def test_significant_inversions():
     print(f"Array: {arr2}")
     print()
     
-    count_dc, sorted_arr, comps = count_significant_inversions(arr2)
+    count_dc, sorted_arr, comps = count_significant_inversions_counted(arr2)
     count_naive = count_significant_inversions_naive(arr2)
     
     print(f"Divide & Conquer Result: {count_dc} significant inversions")
@@ -148,7 +204,7 @@ def test_significant_inversions():
         print(f"  ({i}, {j}): {ai} > 2*{aj} = {2*aj} ✓")
     print()
     
-    count_dc, sorted_arr, comps = count_significant_inversions(arr3)
+    count_dc, sorted_arr, comps = count_significant_inversions_counted(arr3)
     count_naive = count_significant_inversions_naive(arr3)
     
     print(f"Divide & Conquer Result: {count_dc} significant inversions")
@@ -169,7 +225,7 @@ def test_significant_inversions():
         print(f"  ({i}, {j}): {ai} > 2*{aj} = {2*aj} ✓")
     print()
     
-    count_dc, sorted_arr, comps = count_significant_inversions(arr4)
+    count_dc, sorted_arr, comps = count_significant_inversions_counted(arr4)
     count_naive = count_significant_inversions_naive(arr4)
     
     print(f"Divide & Conquer Result: {count_dc} significant inversions")
@@ -204,7 +260,7 @@ def test_significant_inversions():
     print(f"Total significant inversions: {len(significant_inversions)}")
     print()
     
-    count_dc, sorted_arr, comps = count_significant_inversions(arr5)
+    count_dc, sorted_arr, comps = count_significant_inversions_counted(arr5)
     print(f"Divide & Conquer confirms: {count_dc} significant inversions")
     print()
     print("Notice: Significant inversions ≤ Regular inversions")
@@ -220,7 +276,7 @@ def test_significant_inversions():
     print(f"Array: {arr6}")
     print()
     
-    count_dc, sorted_arr, comps = count_significant_inversions(arr6)
+    count_dc, sorted_arr, comps = count_significant_inversions_counted(arr6)
     count_naive = count_significant_inversions_naive(arr6)
     
     print(f"Divide & Conquer Result: {count_dc} significant inversions")
@@ -239,17 +295,58 @@ def test_significant_inversions():
     print("-" * 80)
     
     arr7a = [42]
-    count7a, _, _ = count_significant_inversions(arr7a)
+    count7a, _, _ = count_significant_inversions_counted(arr7a)
     print(f"Single element {arr7a}: {count7a} inversions (expected 0)")
     
     arr7b = [10, 4]
-    count7b, _, _ = count_significant_inversions(arr7b)
+    count7b, _, _ = count_significant_inversions_counted(arr7b)
     print(f"Two elements {arr7b}: {count7b} inversions (10 > 2*4=8, so 1)")
     
     arr7c = [10, 6]
-    count7c, _, _ = count_significant_inversions(arr7c)
+    count7c, _, _ = count_significant_inversions_counted(arr7c)
     print(f"Two elements {arr7c}: {count7c} inversions (10 > 2*6=12? No, so 0)")
     print()
+    
+    print("-" * 80)
+    print("Test Case 8: Out-of-Core Counting from a Binary File")
+    print("-" * 80)
+    rng = random.Random(49)
+    arr8 = [rng.randint(-1000, 1000) for _ in range(1500)]
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "values.bin")
+        with open(path, "wb") as f:
+            array("q", arr8).tofile(f)
+        
+        # A 100-element budget forces 15 runs and a k-way merge
+        count_external = count_significant_inversions_external(path, memory_limit=100 * ELEMENT_BYTES,
+                                                               tmpdir=folder)
+    count_dc, _, _ = count_significant_inversions_counted(arr8)
+    count_naive = count_significant_inversions_naive(arr8)
+    
+    print(f"Array size: {len(arr8)} (int64 file, budget of 100 elements)")
+    print(f"External Result: {count_external} significant inversions")
+    print(f"In-Memory Result: {count_dc} significant inversions")
+    print(f"Naive Result: {count_naive} significant inversions")
+    print(f"Match: {count_external == count_dc == count_naive} ✓")
+    print()
+    
+    print("-" * 80)
+    print("Test Case 9: Sorted, Near-Sorted and Reversed Permutations (n = 500)")
+    print("-" * 80)
+    n = 500
+    workloads = {
+        "sorted": sorted_permutation(n),
+        "near sorted": near_sorted(n, 20, seed=9),
+        "random": random_permutation(n, seed=9),
+        "near reverse sorted": near_reverse_sorted(n, 20, seed=9),
+        "reverse sorted": reverse_sorted(n),
+    }
+    for name, perm in workloads.items():
+        count_dc, _, comps = count_significant_inversions_counted(perm)
+        count_naive = count_significant_inversions_naive(perm)
+        print(f"{name:>20}: {count_dc} significant inversions, {comps} comparisons, "
+              f"naive {count_naive} {'✓' if count_dc == count_naive else '✗'}")
+    print()
 
 
 def explain_algorithm():
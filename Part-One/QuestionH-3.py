@@ -1,5 +1,22 @@
+import csv
+import os
+import sys
+import tempfile
+import time
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+from operator import attrgetter
+
+from divide_conquer import DivideAndConquer, run
+from instrumentation import active
+
+
 class BankCard:
     
+    __slots__ = ("card_id", "account")
+    
     def __init__(self, card_id, account):
         self.card_id = card_id
         self.account = account
@@ -8,6 +25,45 @@ class BankCard:
         return f"Card{self.card_id}(Acc:{self.account})"
 
 
+class CardBatch:
+    
+    def __init__(self):
+        self.card_ids = array('q')
+        self.account_ids = array('i')
+        self.accounts = []
+        self.codes = {}
+    
+    def append(self, card_id, account):
+        code = self.codes.get(account)
+        if code is None:
+            code = len(self.accounts)
+            self.codes[account] = code
+            self.accounts.append(account)
+        self.card_ids.append(card_id)
+        self.account_ids.append(code)
+    
+    def __len__(self):
+        return len(self.card_ids)
+    
+    def card(self, index):
+        return BankCard(self.card_ids[index], self.accounts[self.account_ids[index]])
+    
+    def extend_csv(self, f, id_column="card_id", account_column="account"):
+        reader = csv.reader(f)
+        header = next(reader)
+        id_index = header.index(id_column)
+        account_index = header.index(account_column)
+        for row in reader:
+            self.append(int(row[id_index]), row[account_index])
+    
+    @classmethod
+    def from_csv(cls, path, id_column="card_id", account_column="account"):
+        batch = cls()
+        with open(path, newline="") as f:
+            batch.extend_csv(f, id_column, account_column)
+        return batch
+
+
 class EquivalenceTester:
     
     def __init__(self):
@@ -25,67 +81,23 @@ class EquivalenceTester:
 
 
 def find_majority_card(cards, tester):
-    
-    def find_candidate(cards_subset):
-        n = len(cards_subset)
-        
-        if n == 0:
-            return None
-        if n == 1:
-            return cards_subset[0]
-        if n == 2:
-            if tester.are_equivalent(cards_subset[0], cards_subset[1]):
-                return cards_subset[0]
-            else:
-                return None
-        
-        mid = n // 2
-        left_cards = cards_subset[:mid]
-        right_cards = cards_subset[mid:]
-        
-        left_candidate = find_candidate(left_cards)
-        right_candidate = find_candidate(right_cards)
-        
-        if left_candidate is None and right_candidate is None:
-            return None
-        
-        if left_candidate is None:
-            count = count_equivalent(cards_subset, right_candidate, tester)
-            return right_candidate if count > n // 2 else None
-        
-        if right_candidate is None:
-            count = count_equivalent(cards_subset, left_candidate, tester)
-            return left_candidate if count > n // 2 else None
-        
-        if tester.are_equivalent(left_candidate, right_candidate):
-            return left_candidate
-        
-        left_count = count_equivalent(cards_subset, left_candidate, tester)
-        right_count = count_equivalent(cards_subset, right_candidate, tester)
-        
-        if left_count > n // 2:
-            return left_candidate
-        elif right_count > n // 2:
-            return right_candidate
-        else:
-            return None
-    
-    def count_equivalent(cards_subset, candidate, tester):
-        if candidate is None:
-            return 0
-        
-        count = 0
-        for card in cards_subset:
-            if tester.are_equivalent(card, candidate):
-                count += 1
-        return count
-    
-    candidate = find_candidate(cards)
+    stats = active()
+    if stats is not None:
+        before = tester.get_count()
+        with stats.timer("find_majority_card"):
+            result = _find_majority_card(cards, tester)
+        stats.count("find_majority_card equivalence tests", tester.get_count() - before)
+        return result
+    return _find_majority_card(cards, tester)
+
+
+def _find_majority_card(cards, tester):
+    candidate = run(MajorityCandidateAlgorithm(tester), list(cards))
     
     if candidate is None:
         return None
     
-    final_count = count_equivalent(cards, candidate, tester)
+    final_count = _count_equivalent(cards, candidate, tester)
     
     if final_count > len(cards) // 2:
         return candidate
@@ -94,6 +106,17 @@ def find_majority_card(cards, tester):
 
 
 def find_majority_card_optimized(cards, tester):
+    stats = active()
+    if stats is not None:
+        before = tester.get_count()
+        with stats.timer("find_majority_card_optimized"):
+            result = _find_majority_card_optimized(cards, tester)
+        stats.count("find_majority_card_optimized equivalence tests", tester.get_count() - before)
+        return result
+    return _find_majority_card_optimized(cards, tester)
+
+
+def _find_majority_card_optimized(cards, tester):
     
     def find_candidate_optimized(cards_subset):
         n = len(cards_subset)
@@ -142,6 +165,268 @@ def find_majority_card_optimized(cards, tester):
     return candidate if count > len(cards) // 2 else None
 
 
+class MajorityCandidateAlgorithm(DivideAndConquer):
+    # Candidate search for find_majority_card, run on an explicit stack. The
+    # tester counts comparisons in this process, so it only runs sequentially.
+    
+    def __init__(self, tester):
+        self.tester = tester
+    
+    def size(self, problem):
+        return len(problem)
+    
+    def is_base(self, problem):
+        return len(problem) <= 2
+    
+    def base(self, problem):
+        if len(problem) == 0:
+            return None
+        if len(problem) == 1:
+            return problem[0]
+        if self.tester.are_equivalent(problem[0], problem[1]):
+            return problem[0]
+        return None
+    
+    def divide(self, problem):
+        mid = len(problem) // 2
+        return [problem[:mid], problem[mid:]]
+    
+    def combine(self, problem, results):
+        left_candidate, right_candidate = results
+        n = len(problem)
+        
+        if left_candidate is None and right_candidate is None:
+            return None
+        
+        if left_candidate is None:
+            count = _count_equivalent(problem, right_candidate, self.tester)
+            return right_candidate if count > n // 2 else None
+        
+        if right_candidate is None:
+            count = _count_equivalent(problem, left_candidate, self.tester)
+            return left_candidate if count > n // 2 else None
+        
+        if self.tester.are_equivalent(left_candidate, right_candidate):
+            return left_candidate
+        
+        left_count = _count_equivalent(problem, left_candidate, self.tester)
+        right_count = _count_equivalent(problem, right_candidate, self.tester)
+        
+        if left_count > n // 2:
+            return left_candidate
+        elif right_count > n // 2:
+            return right_candidate
+        else:
+            return None
+
+
+def _count_equivalent(cards, candidate, tester):
+    count = 0
+    for card in cards:
+        if tester.are_equivalent(card, candidate):
+            count += 1
+    return count
+
+
+class SlowEquivalenceTester(EquivalenceTester):
+    
+    def __init__(self, latency):
+        super().__init__()
+        self.latency = latency
+    
+    def are_equivalent(self, card1, card2):
+        time.sleep(self.latency)
+        return super().are_equivalent(card1, card2)
+
+
+def find_majority_card_parallel(cards, tester, workers=8, executor=None):
+    # Same pairing rounds and verification as find_majority_card_optimized,
+    # but each round's comparisons are submitted together to the executor.
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=workers)
+    
+    def compare_all(pairs):
+        # Worker threads can race on the tester's counter, so the count for
+        # the round is settled here, in the calling thread: one test per pair
+        before = tester.get_count()
+        results = list(executor.map(lambda pair: tester.are_equivalent(*pair), pairs))
+        tester.comparison_count = before + len(pairs)
+        return results
+    
+    try:
+        survivors = list(cards)
+        while len(survivors) > 1:
+            pairs = [(survivors[i], survivors[i + 1]) for i in range(0, len(survivors) - 1, 2)]
+            results = compare_all(pairs)
+            next_round = [pair[0] for pair, same in zip(pairs, results) if same]
+            if len(survivors) % 2 == 1:
+                next_round.append(survivors[-1])
+            survivors = next_round
+        
+        if len(survivors) == 0:
+            return None
+        
+        candidate = survivors[0]
+        count = sum(compare_all([(card, candidate) for card in cards]))
+        
+        return candidate if count > len(cards) // 2 else None
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+
+def _passes(cards, name):
+    # Two-pass algorithms need a source they can read twice: a re-iterable
+    # collection, or a zero-argument factory returning a fresh iterator per
+    # pass. A one-shot iterator would leave the verification pass empty.
+    if callable(cards):
+        return cards
+    if iter(cards) is cards:
+        raise TypeError(f"{name} reads its input twice; pass a re-iterable "
+                        "collection or a factory returning a fresh iterator, "
+                        "not a one-shot iterator")
+    return lambda: iter(cards)
+
+
+def find_majority_card_streaming(cards, tester):
+    cards = _passes(cards, "find_majority_card_streaming")
+    candidate = None
+    count = 0
+    n = 0
+    
+    for card in cards():
+        n += 1
+        if count == 0:
+            candidate = card
+            count = 1
+        elif tester.are_equivalent(card, candidate):
+            count += 1
+        else:
+            count -= 1
+    
+    if candidate is None:
+        return None
+    
+    final_count = 0
+    for card in cards():
+        if tester.are_equivalent(card, candidate):
+            final_count += 1
+    
+    return candidate if final_count > n // 2 else None
+
+
+def find_frequent_cards(cards, tester, k, key=None, workers=0):
+    if key is not None:
+        # One pass: the counting keeps a card per account as its representative
+        totals, firsts = _count_accounts(cards, key, workers, keep_first=True)
+        return [firsts[account] for account in _above(totals, k)]
+    
+    cards = _passes(cards, "find_frequent_cards")
+    candidates = []
+    counts = []
+    n = 0
+    
+    for card in cards():
+        n += 1
+        for i, candidate in enumerate(candidates):
+            if tester.are_equivalent(card, candidate):
+                counts[i] += 1
+                break
+        else:
+            if len(candidates) < k - 1:
+                candidates.append(card)
+                counts.append(1)
+            else:
+                counts = [c - 1 for c in counts]
+                candidates = [c for c, count in zip(candidates, counts) if count > 0]
+                counts = [count for count in counts if count > 0]
+    
+    final_counts = [0] * len(candidates)
+    for card in cards():
+        for i, candidate in enumerate(candidates):
+            if tester.are_equivalent(card, candidate):
+                final_counts[i] += 1
+                break
+    
+    return [candidate for candidate, count in zip(candidates, final_counts)
+            if count > n // k]
+
+
+def _count_batch(batch, key, keep_first=False):
+    if not keep_first:
+        return Counter(batch if key is None else map(key, batch)), None
+    keys = batch if key is None else list(map(key, batch))
+    # dict() keeps the last value per key, so feeding it reversed keeps the first card
+    return Counter(keys), dict(zip(reversed(keys), reversed(batch)))
+
+
+def _count_accounts(cards, key, workers=0, batch_size=100_000, keep_first=False):
+    totals = Counter()
+    firsts = {}
+    cards = iter(cards)
+    batches = iter(lambda: list(islice(cards, batch_size)), [])
+    
+    def merge(result):
+        counts, first = result
+        totals.update(counts)
+        if first:
+            for account, card in first.items():
+                firsts.setdefault(account, card)
+    
+    if workers <= 1:
+        for batch in batches:
+            merge(_count_batch(batch, key, keep_first))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = set()
+            for batch in batches:
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        merge(future.result())
+                pending.add(executor.submit(_count_batch, batch, key, keep_first))
+            for future in pending:
+                merge(future.result())
+    
+    return totals, firsts
+
+
+def _above(totals, k):
+    n = sum(totals.values())
+    return {account: count for account, count in totals.items() if count > n // k}
+
+
+def find_frequent_accounts(cards, k, key, workers=0, batch_size=100_000):
+    totals, _ = _count_accounts(cards, key, workers, batch_size)
+    return _above(totals, k)
+
+
+def find_majority_in_batch(batch):
+    account_ids = batch.account_ids
+    candidate = -1
+    count = 0
+    
+    for code in account_ids:
+        if count == 0:
+            candidate = code
+            count = 1
+        elif code == candidate:
+            count += 1
+        else:
+            count -= 1
+    
+    if candidate == -1 or account_ids.count(candidate) <= len(batch) // 2:
+        return None
+    return batch.card(account_ids.index(candidate))
+
+
+def find_frequent_in_batch(batch, k):
+    counts = Counter(batch.account_ids)
+    return [batch.card(batch.account_ids.index(code))
+            for code, count in counts.items() if count > len(batch) // k]
+
+
 def test_fraud_detection():
     
     print("=" * 80)
@@ -175,7 +460,6 @@ def test_fraud_detection():
     
     print(f"Cards: {cards1}")
     print(f"Account distribution:")
-    from collections import Counter
     dist = Counter(c.account for c in cards1)
     for acc, count in sorted(dist.items()):
         print(f"  {acc}: {count} cards", "← MAJORITY!" if count > len(cards1)//2 else "")
@@ -346,6 +630,81 @@ def test_fraud_detection():
     print(f"Theoretical max: O(n log n) ≈ {len(cards6) * len(cards6).bit_length()}")
     print(f"Naive approach would need: O(n²) ≈ {len(cards6) * len(cards6)} comparisons")
     print()
+    
+    print("-" * 80)
+    print("Test Case 7: Streaming (Boyer-Moore) on the same 50 cards")
+    print("-" * 80)
+    tester7 = EquivalenceTester()
+    result = find_majority_card_streaming(cards6, tester7)
+    
+    print(f"Result: {'FRAUD DETECTED!' if result else 'No fraud detected'}")
+    if result:
+        print(f"Majority account: {result.account}")
+    print(f"Comparisons used: {tester7.get_count()} (at most 2n = {2 * len(cards6)})")
+    print()
+    
+    print("-" * 80)
+    print("Test Case 8: Accounts with more than n/4 cards (Misra-Gries, k = 4)")
+    print("-" * 80)
+    tester8 = EquivalenceTester()
+    cards8 = [BankCard(i, acc) for i, acc in enumerate(
+        ["ACC_A", "ACC_B", "ACC_A", "ACC_C", "ACC_B", "ACC_A", "ACC_D", "ACC_B",
+         "ACC_E", "ACC_A", "ACC_F", "ACC_B", "ACC_G", "ACC_A", "ACC_H", "ACC_I"], 1)]
+    dist = Counter(c.account for c in cards8)
+    print(f"n = {len(cards8)}, n/4 = {len(cards8) // 4}")
+    print(f"Account distribution (top 3): {dist.most_common(3)}")
+    results = find_frequent_cards(cards8, tester8, 4)
+    print(f"Frequent accounts: {sorted(card.account for card in results)}")
+    print(f"Comparisons used: {tester8.get_count()} (at most 2(k-1)n = {2 * 3 * len(cards8)})")
+    print()
+    
+    print("-" * 80)
+    print("Test Case 9: Hashed account keys, counted in parallel (200,000 cards)")
+    print("-" * 80)
+    cards9 = [BankCard(i, "ACC_FRAUD" if i % 3 else f"ACC_{i}") for i in range(200_000)]
+    counts = find_frequent_accounts(cards9, 2, attrgetter("account"), workers=2,
+                                    batch_size=25_000)
+    print(f"Majority accounts: {counts}")
+    results = find_frequent_cards(cards9[:30], EquivalenceTester(), 2, key=attrgetter("account"))
+    print(f"Representative card (first 30 cards, hashed mode): {results}")
+    print()
+    
+    print("-" * 80)
+    print("Test Case 10: Slow equivalence tester (2 ms per test), 16 parallel tests")
+    print("-" * 80)
+    serial_tester = SlowEquivalenceTester(0.002)
+    start = time.perf_counter()
+    serial_result = find_majority_card_optimized(cards6, serial_tester)
+    serial_time = time.perf_counter() - start
+    
+    parallel_tester = SlowEquivalenceTester(0.002)
+    start = time.perf_counter()
+    parallel_result = find_majority_card_parallel(cards6, parallel_tester, workers=16)
+    parallel_time = time.perf_counter() - start
+    
+    print(f"Serial:   {serial_result}, {serial_tester.get_count()} comparisons, {serial_time * 1000:.0f} ms")
+    print(f"Parallel: {parallel_result}, {parallel_tester.get_count()} comparisons, {parallel_time * 1000:.0f} ms")
+    print()
+    
+    print("-" * 80)
+    print("Test Case 11: Columnar card batch loaded from CSV (200,000 cards)")
+    print("-" * 80)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "cards.csv")
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["card_id", "account"])
+            for i in range(200_000):
+                writer.writerow([i, "ACC_FRAUD" if i % 3 else f"ACC_{i % 1000}"])
+        batch = CardBatch.from_csv(path)
+    
+    columnar_bytes = (batch.card_ids.itemsize + batch.account_ids.itemsize) * len(batch)
+    object_bytes = sys.getsizeof(BankCard(0, "ACC_FRAUD")) * len(batch)
+    print(f"Cards: {len(batch)}, distinct accounts: {len(batch.accounts)}")
+    print(f"Column storage: {columnar_bytes // 1024} KiB (BankCard objects: {object_bytes // 1024} KiB)")
+    print(f"Majority card: {find_majority_in_batch(batch)}")
+    print(f"Accounts above n/3: {find_frequent_in_batch(batch, 3)}")
+    print()
 
 
 def explain_algorithm():
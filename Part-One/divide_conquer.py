@@ -0,0 +1,95 @@
+from concurrent.futures import ProcessPoolExecutor
+
+
+class DivideAndConquer:
+    
+    def size(self, problem):
+        raise NotImplementedError
+    
+    def is_base(self, problem):
+        raise NotImplementedError
+    
+    def base(self, problem):
+        raise NotImplementedError
+    
+    def divide(self, problem):
+        raise NotImplementedError
+    
+    def combine(self, problem, results):
+        raise NotImplementedError
+    
+    def sequential(self, problem):
+        return run_stack(self, problem)
+    
+    def scatter(self, problem):
+        return problem
+    
+    def gather(self, problem, result):
+        return result
+
+
+def run_stack(algorithm, problem, cutoff=0):
+    # Post-order walk with an explicit stack: a subproblem is pushed once to be
+    # divided and once more (as a combine marker) to merge its children's
+    # results, which are kept in order on a separate results stack.
+    results = []
+    stack = [(False, problem)]
+    
+    while stack:
+        combining, item = stack.pop()
+        
+        if combining:
+            problem, parts = item
+            children = results[len(results) - parts:]
+            del results[len(results) - parts:]
+            results.append(algorithm.combine(problem, children))
+        elif algorithm.is_base(item):
+            results.append(algorithm.base(item))
+        elif cutoff and algorithm.size(item) <= cutoff:
+            results.append(algorithm.sequential(item))
+        else:
+            parts = algorithm.divide(item)
+            stack.append((True, (item, len(parts))))
+            stack.extend((False, part) for part in reversed(parts))
+    
+    return results[0]
+
+
+def _solve_subtree(algorithm, problem, cutoff):
+    return run_stack(algorithm, problem, cutoff)
+
+
+def run(algorithm, problem, cutoff=0, workers=0, parallel_depth=None):
+    if workers <= 1:
+        return run_stack(algorithm, problem, cutoff)
+    
+    if parallel_depth is None:
+        parallel_depth = (workers - 1).bit_length() + 1
+    
+    leaves = []
+    
+    def plan(problem, depth):
+        if (depth == parallel_depth or algorithm.is_base(problem)
+                or (cutoff and algorithm.size(problem) <= cutoff)):
+            leaves.append(problem)
+            return len(leaves) - 1
+        return problem, [plan(part, depth + 1) for part in algorithm.divide(problem)]
+    
+    tree = plan(problem, 0)
+    
+    # scatter() lets an algorithm ship a self-contained copy of each subtree
+    # (e.g. a slice instead of the whole array); gather() maps the worker's
+    # result back, e.g. by shifting indices.
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_solve_subtree, algorithm, algorithm.scatter(leaf), cutoff)
+                   for leaf in leaves]
+        leaf_results = [algorithm.gather(leaf, future.result())
+                        for leaf, future in zip(leaves, futures)]
+    
+    def assemble(node):
+        if isinstance(node, int):
+            return leaf_results[node]
+        problem, children = node
+        return algorithm.combine(problem, [assemble(child) for child in children])
+    
+    return assemble(tree)
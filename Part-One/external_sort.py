@@ -0,0 +1,59 @@
+import heapq
+import os
+import tempfile
+from array import array
+
+
+def read_records(path, typecode="q", block=1 << 16, width=1):
+    # Streams a binary file of `typecode` values, `block` records at a time.
+    # With width > 1 every `width` consecutive values form one tuple record,
+    # e.g. the (x, y) int64 pairs of a point file.
+    with open(path, "rb") as f:
+        while True:
+            chunk = array(typecode)
+            try:
+                chunk.fromfile(f, block * width)
+            except EOFError:
+                pass
+            if not chunk:
+                return
+            if width == 1:
+                yield from chunk
+            else:
+                yield from zip(*(chunk[i::width] for i in range(width)))
+
+
+def write_records(f, records, typecode="q", block=1 << 16, width=1):
+    # Buffered counterpart of read_records: one tofile call per `block` records
+    chunk = array(typecode)
+    append = chunk.append if width == 1 else chunk.extend
+    for record in records:
+        append(record)
+        if len(chunk) >= block * width:
+            chunk.tofile(f)
+            del chunk[:]
+    chunk.tofile(f)
+
+
+def external_sort(runs, out_path, typecode="q", block=1 << 16, width=1, key=None, tmpdir=None):
+    # Merge sort for data larger than memory. `runs` yields chunks that are
+    # already sorted and fit in memory, as arrays or NumPy arrays of
+    # `typecode` values; each is spilled to a scratch file and the files are
+    # k-way merged into `out_path`, reading and writing about `block` records
+    # at a time.
+    with tempfile.TemporaryDirectory(dir=tmpdir) as workdir:
+        paths = []
+        for run in runs:
+            path = os.path.join(workdir, f"run_{len(paths)}.bin")
+            with open(path, "wb") as f:
+                run.tofile(f)
+            paths.append(path)
+            del run  # release it before the next run is built
+
+        read_block = max(block // (len(paths) + 1), 1)
+        merged = heapq.merge(*(read_records(path, typecode, read_block, width) for path in paths),
+                             key=key)
+        with open(out_path, "wb") as f:
+            write_records(f, merged, typecode, read_block, width)
+
+    return out_path
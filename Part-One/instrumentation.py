@@ -0,0 +1,58 @@
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+
+class Instrumentation:
+    
+    def __init__(self):
+        self.counters = Counter()
+        self.timers = defaultdict(float)
+        self.depths = defaultdict(Counter)
+    
+    def count(self, name, amount=1):
+        self.counters[name] += amount
+    
+    def record_depth(self, name, depth):
+        self.depths[name][depth] += 1
+    
+    @contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timers[name] += time.perf_counter() - start
+    
+    def report(self):
+        lines = []
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"{name}: {value}")
+        for name, seconds in sorted(self.timers.items()):
+            lines.append(f"{name} time: {seconds * 1000:.3f} ms")
+        for name, histogram in sorted(self.depths.items()):
+            levels = ", ".join(f"{depth}: {calls}" for depth, calls in sorted(histogram.items()))
+            lines.append(f"{name} calls per recursion depth: {levels}")
+        return "\n".join(lines)
+
+
+_active = None
+
+
+def active():
+    return _active
+
+
+@contextmanager
+def instrumented(instrumentation=None):
+    # Algorithms look up the active Instrumentation once per call and switch
+    # to their counting variant; functions whose counts are part of the result
+    # do this in a separate *_counted entry point, so their plain version never
+    # looks at it.
+    global _active
+    previous = _active
+    _active = instrumentation if instrumentation is not None else Instrumentation()
+    try:
+        yield _active
+    finally:
+        _active = previous
@@ -0,0 +1,88 @@
+import random
+
+
+# Inversion counting
+
+def sorted_permutation(n):
+    return list(range(n))
+
+
+def reverse_sorted(n):
+    # n(n-1)/2 inversions, the maximum
+    return list(range(n - 1, -1, -1))
+
+
+def near_sorted(n, swaps, seed=None):
+    # Sorted order disturbed by `swaps` random transpositions of neighbours
+    rng = random.Random(seed)
+    arr = list(range(n))
+    for _ in range(swaps if n > 1 else 0):
+        i = rng.randrange(n - 1)
+        arr[i], arr[i + 1] = arr[i + 1], arr[i]
+    return arr
+
+
+def near_reverse_sorted(n, swaps, seed=None):
+    return near_sorted(n, swaps, seed)[::-1]
+
+
+def random_permutation(n, seed=None):
+    arr = list(range(n))
+    random.Random(seed).shuffle(arr)
+    return arr
+
+
+# Peak finding
+
+def unimodal(n, peak, ascent=1, descent=1):
+    # Strictly increasing up to `peak`, strictly decreasing after it
+    top = peak * ascent
+    return [i * ascent if i <= peak else top - (i - peak) * descent for i in range(n)]
+
+
+def worst_case_unimodal(n):
+    # Peaks at or next to either end make every probe move the same way, and
+    # the lopsided slopes defeat any guess based on where the values cross.
+    return {
+        "ascending": unimodal(n, n - 1),
+        "descending": unimodal(n, 0),
+        "near_left": unimodal(n, min(1, n - 1)),
+        "near_right": unimodal(n, max(n - 2, 0)),
+        "steep_descent": unimodal(n, n // 3, ascent=1, descent=n),
+        "steep_ascent": unimodal(n, 2 * n // 3, ascent=n, descent=1),
+    }
+
+
+# Median of databases
+
+def median_split_databases(n, split, seed=None):
+    # Two sorted lists of n distinct values each, where a `split` fraction of
+    # the first list lies below the overall median. split=0 or 1 puts the
+    # median partition at an end of the binary search.
+    rng = random.Random(seed)
+    values = sorted(rng.sample(range(20 * n + 1), 2 * n))
+    low, high = values[:n], values[n:]
+    below = round(split * n)
+    rng.shuffle(low)
+    rng.shuffle(high)
+    first = low[:below] + high[:n - below]
+    second = low[below:] + high[n - below:]
+    return sorted(first), sorted(second)
+
+
+def skewed_databases(total, ratios, overlap=True, seed=None):
+    # Sorted lists whose sizes follow `ratios`, e.g. (1, 1000). Without
+    # overlap, each list holds a contiguous block of the value range.
+    rng = random.Random(seed)
+    weight = sum(ratios)
+    sizes = [max(1, total * r // weight) for r in ratios]
+    values = sorted(rng.sample(range(10 * sum(sizes) + 1), sum(sizes)))
+    if overlap:
+        rng.shuffle(values)
+
+    dbs = []
+    start = 0
+    for size in sizes:
+        dbs.append(sorted(values[start:start + size]))
+        start += size
+    return dbs
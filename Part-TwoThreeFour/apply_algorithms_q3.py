@@ -1,13 +1,13 @@
 import os
-import json
-from closest_pair_q2_p1 import closest_pair
-from karatsuba_q2_p2 import karatsuba
+from closest_pair_q2_part1 import closest_pair
+from karatsuba_q2_part2 import karatsuba
+from result_sink import ResultSink
 
 
 # APPLY CLOSEST PAIR ALGORITHM 
-def run_closest_pair_tests():
+def run_closest_pair_tests(sink):
     input_folder = "inputs_closest"
-    output_results = []
+    count = 0
 
     print("\n=== Running Closest Pair Tests ===\n")
     for filename in sorted(os.listdir(input_folder)):
@@ -26,18 +26,19 @@ def run_closest_pair_tests():
 
             print(f"{filename} -> Closest Distance = {dist:.4f}")
 
-            output_results.append({
+            sink.write({
                 "file": filename,
                 "closest_distance": dist
             })
+            count += 1
 
-    return output_results
+    return count
 
 
 #  APPLY INTEGER MULTIPLICATION ALGORITHM 
-def run_integer_multiplication_tests():
+def run_integer_multiplication_tests(sink):
     input_folder = "integer_multiplication_inputs"
-    output_results = []
+    count = 0
 
     print("\n=== Running Integer Multiplication Tests ===\n")
     for filename in sorted(os.listdir(input_folder)):
@@ -52,29 +53,27 @@ def run_integer_multiplication_tests():
 
             print(f"{filename} -> {len(str(result))} digits product")
 
-            output_results.append({
+            sink.write({
                 "file": filename,
                 "x_digits": len(str(x)),
                 "y_digits": len(str(y)),
                 "product_digits": len(str(result)),
             })
+            count += 1
 
-    return output_results
+    return count
 
 
-def save_results(cp_results, mult_results):
+# Results are appended as they are produced (compact JSON Lines, gzip),
+# with a .idx file for looking them up by input file; every run starts
+# a fresh output
+if __name__ == "__main__":
     os.makedirs("results", exist_ok=True)
 
-    with open("results/closest_pair_results.json", "w") as f:
-        json.dump(cp_results, f, indent=4)
+    with ResultSink("results/closest_pair_results.jsonl.gz", mode="w") as sink:
+        run_closest_pair_tests(sink)
 
-    with open("results/integer_multiplication_results.json", "w") as f:
-        json.dump(mult_results, f, indent=4)
+    with ResultSink("results/integer_multiplication_results.jsonl.gz", mode="w") as sink:
+        run_integer_multiplication_tests(sink)
 
     print("\nResults saved to /results folder.")
-
-
-if __name__ == "__main__":
-    cp_results = run_closest_pair_tests()
-    mult_results = run_integer_multiplication_tests()
-    save_results(cp_results, mult_results)
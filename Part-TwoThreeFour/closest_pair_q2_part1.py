@@ -1,66 +1,373 @@
-import random
 import math
 import os
+import sys
+import tempfile
+from bisect import bisect_left, bisect_right
+from collections import Counter, deque
+from itertools import islice
+from operator import itemgetter
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "Part-One"))
+from divide_conquer import DivideAndConquer, run
+from external_sort import external_sort, read_records
+from input_generators import POINT_DISTRIBUTIONS, generate_point_files, write_point_file
 
 def dist(p1, p2):
     return math.sqrt((p1[0] - p2[0])**2 + (p1[1] - p2[1])**2)
 
 
 def brute_force(points):
-    min_val = float("inf")
+    return _brute_force_pair(points)[0]
+
+
+def _brute_force_pair(points):
+    # (distance, p, q) for the closest pair; (inf, None, None) below two points
+    best = (float("inf"), None, None)
     for i in range(len(points)):
         for j in range(i + 1, len(points)):
-            min_val = min(min_val, dist(points[i], points[j]))
-    return min_val
+            d = dist(points[i], points[j])
+            if d < best[0]:
+                best = (d, points[i], points[j])
+    return best
 
 
 def strip_closest(strip, d):
-    min_val = d
+    return _strip_closest_pair(strip, (d, None, None))[0]
+
+
+def _strip_closest_pair(strip, best):
     strip.sort(key=lambda p: p[1])
 
     for i in range(len(strip)):
         for j in range(i + 1, len(strip)):
-            if strip[j][1] - strip[i][1] >= min_val:
+            if strip[j][1] - strip[i][1] >= best[0]:
                 break
-            min_val = min(min_val, dist(strip[i], strip[j]))
+            d = dist(strip[i], strip[j])
+            if d < best[0]:
+                best = (d, strip[i], strip[j])
+
+    return best
+
+def find_duplicate(points):
+    # A point that occurs more than once, or None. NumPy arrays are checked by
+    # sorting the rows and comparing neighbours instead of hashing.
+    if isinstance(points, np.ndarray):
+        ordered = points[np.lexsort((points[:, 1], points[:, 0]))]
+        hits = np.flatnonzero((ordered[1:] == ordered[:-1]).all(axis=1))
+        return tuple(ordered[hits[0]].tolist()) if len(hits) else None
+
+    # Points may arrive as lists (e.g. decoded JSON), so hash them as tuples
+    seen = set()
+    for p in points:
+        key = tuple(p)
+        if key in seen:
+            return p
+        seen.add(key)
+    return None
+
+
+def _point_list(points):
+    # An (n, 2) NumPy array becomes a list of tuples, so sorting orders whole
+    # points rather than the coordinates inside each row
+    if isinstance(points, np.ndarray):
+        return [tuple(p) for p in points.tolist()]
+    return points
 
-    return min_val
 
 def closest_pair(points):
+    # A repeated point makes the answer 0, so skip the recursion entirely
+    if find_duplicate(points) is not None:
+        return 0.0
+    points = _point_list(points)
     points.sort()
     return closest_pair_rec(points)
 
 
-def closest_pair_rec(points):
+def closest_pair_with_pair(points):
+    # Like closest_pair, but returns (distance, p, q); a repeated point p is
+    # reported straight away as (0.0, p, p)
+    duplicate = find_duplicate(points)
+    if duplicate is not None:
+        return 0.0, duplicate, duplicate
+    return _closest_pair(sorted(_point_list(points)))
+
+
+def closest_pair_distinct(points):
+    # Closest distance between distinct locations, plus how often each
+    # repeated point occurs
+    counts = Counter(map(tuple, _point_list(points)))
+    d = closest_pair_rec(sorted(counts))
+    return d, {p: c for p, c in counts.items() if c > 1}
+
+
+class PointIndex:
+    # Static 2-d tree stored implicitly in a list: the median of every range
+    # sits at its midpoint and the split axis alternates with depth.
+
+    def __init__(self, points):
+        self.points = list(points)
+        stack = [(0, len(self.points), 0)]
+        while stack:
+            lo, hi, axis = stack.pop()
+            if hi - lo <= 1:
+                continue
+            self.points[lo:hi] = sorted(self.points[lo:hi], key=itemgetter(axis))
+            mid = (lo + hi) // 2
+            stack.append((lo, mid, 1 - axis))
+            stack.append((mid + 1, hi, 1 - axis))
+
+    def nearest(self, q):
+        # Returns (distance, point); ranges whose splitting line is farther
+        # than the best match so far are skipped.
+        best_sq = float("inf")
+        best = None
+        stack = [(0, len(self.points), 0, 0)]
+
+        while stack:
+            lo, hi, axis, bound_sq = stack.pop()
+            if lo >= hi or bound_sq >= best_sq:
+                continue
+            mid = (lo + hi) // 2
+            p = self.points[mid]
+            d_sq = (p[0] - q[0]) ** 2 + (p[1] - q[1]) ** 2
+            if d_sq < best_sq:
+                best_sq = d_sq
+                best = p
+
+            diff = q[axis] - p[axis]
+            if diff < 0:
+                near, far = (lo, mid), (mid + 1, hi)
+            else:
+                near, far = (mid + 1, hi), (lo, mid)
+            stack.append((far[0], far[1], 1 - axis, diff * diff))
+            stack.append((near[0], near[1], 1 - axis, 0))
+
+        if best is None:
+            return float("inf"), None
+        return dist(q, best), best
+
+
+def nearest_neighbors(A, B):
+    # Nearest point of B for every point of A, as (distance, point) pairs
+    index = PointIndex(B)
+    return [index.nearest(a) for a in A]
+
+
+def closest_pair_between(A, B):
+    # Closest (a, b) pair with a from A and b from B, as (distance, a, b).
+    # The index is built over the smaller set and queried with the larger.
+    swapped = len(B) > len(A)
+    if swapped:
+        A, B = B, A
+
+    index = PointIndex(B)
+    best = (float("inf"), None, None)
+    for a in A:
+        d, b = index.nearest(a)
+        if d < best[0]:
+            best = (d, a, b)
+            if d == 0:
+                break
+
+    if swapped:
+        return best[0], best[2], best[1]
+    return best
+
+
+def closest_pair_rec(points, cutoff=64, workers=0):
+    return _closest_pair(points, cutoff, workers)[0]
+
+
+def _closest_pair(points, cutoff=64, workers=0):
+    # (distance, p, q) for points sorted by x
+    return run(ClosestPairAlgorithm(), points, cutoff, workers)
+
+
+def _closest_pair_rec(points):
+    # Recursive form of _closest_pair, used below the cutoff
     if len(points) <= 3:
-        return brute_force(points)
+        return _brute_force_pair(points)
 
     mid = len(points) // 2
     mid_point = points[mid]
 
-    dl = closest_pair_rec(points[:mid])
-    dr = closest_pair_rec(points[mid:])
-    d = min(dl, dr)
+    best = min(_closest_pair_rec(points[:mid]), _closest_pair_rec(points[mid:]),
+               key=itemgetter(0))
+
+    strip = [p for p in points if abs(p[0] - mid_point[0]) < best[0]]
+
+    return _strip_closest_pair(strip, best)
+
+
+class ClosestPairAlgorithm(DivideAndConquer):
 
-    strip = [p for p in points if abs(p[0] - mid_point[0]) < d]
+    def size(self, points):
+        return len(points)
 
-    return min(d, strip_closest(strip, d))
+    def is_base(self, points):
+        return len(points) <= 3
 
-def generate_inputs():
-    os.makedirs("inputs_closest", exist_ok=True)
+    def base(self, points):
+        return _brute_force_pair(points)
 
-    for i in range(1, 11):
-        n = random.randint(100, 300)
-        points = [(random.randint(0, 10000), random.randint(0, 10000)) for _ in range(n)]
+    def sequential(self, points):
+        return _closest_pair_rec(points)
 
-        with open(f"inputs_closest/closest_points_{i}.txt", "w") as f:
-            for x, y in points:
-                f.write(f"{x} {y}\n")
+    def divide(self, points):
+        mid = len(points) // 2
+        return [points[:mid], points[mid:]]
 
-    print("Generated 10 input files for Closest Pair.\n")
+    def combine(self, points, results):
+        best = min(results, key=itemgetter(0))
+        mid_point = points[len(points) // 2]
+        strip = [p for p in points if abs(p[0] - mid_point[0]) < best[0]]
+        return _strip_closest_pair(strip, best)
 
+def generate_inputs(seed=None, count=10, size=(100, 300), fmt="text", workers=0):
+    generate_point_files("inputs_closest", count, size, seed, fmt=fmt, workers=workers)
 
-def run_closest_pair():
+    print(f"Generated {count} input files for Closest Pair.\n")
+
+
+def load_points(path):
+    # .bin files hold int64 (x, y) pairs written by input_generators
+    if path.endswith(".bin"):
+        return [tuple(p) for p in np.fromfile(path, dtype=np.int64).reshape(-1, 2).tolist()]
+
+    points = []
+    with open(path, "r") as f:
+        for line in f:
+            x, y = map(int, line.split())
+            points.append((x, y))
+    return points
+
+
+# Budget per point of a slab: the (x, y) tuple and its list slot, plus the
+# lists closest_pair builds while recursing over it
+POINT_BYTES = 128
+
+
+def _point_blocks(path, block):
+    # Yields int64 (k, 2) arrays of at most `block` points from a text or .bin file
+    if path.endswith(".bin"):
+        total = os.path.getsize(path) // 16
+        for start in range(0, total, block):
+            count = min(block, total - start)
+            yield np.fromfile(path, dtype=np.int64, count=2 * count, offset=16 * start).reshape(-1, 2)
+        return
+
+    with open(path, "r") as f:
+        while True:
+            lines = list(islice(f, block))
+            if not lines:
+                return
+            yield np.loadtxt(lines, dtype=np.int64, ndmin=2)
+
+
+def external_sort_points(path, out_path, block, tmpdir=None, by="x"):
+    # Sorts the points of `path` by (x, y), or by (y, x) with by="y", into the
+    # .bin file `out_path`, holding at most about `block` points in memory
+    first, second = (0, 1) if by == "x" else (1, 0)
+    runs = (points[np.lexsort((points[:, second], points[:, first]))]
+            for points in _point_blocks(path, block))
+    return external_sort(runs, out_path, "q", block, width=2, key=itemgetter(first, second),
+                         tmpdir=tmpdir)
+
+
+def _sweep_by_y(path, d, block):
+    # Closest distance in a .bin file sorted by (y, x), no larger than d. Only
+    # points less than d below the current one are kept; they are pairwise at
+    # least d apart, so for a band of width O(d) the window stays small.
+    window = deque()
+    for p in read_records(path, "q", block, width=2):
+        while window and window[0][1] <= p[1] - d:
+            window.popleft()
+        for q in window:
+            if abs(q[0] - p[0]) < d:
+                d = min(d, dist(p, q))
+        if d == 0:
+            return d
+        window.append(p)
+    return d
+
+
+def _band_closest(points, lo, hi, d, block, workdir):
+    # Closest distance among the x-sorted points[lo:hi], no larger than d.
+    # A band that does not fit in memory is cut into sub-bands 2d wide, each
+    # starting at a point's x and the next one d further on: a pair closer
+    # than d lies wholly in the sub-band that starts at or before its left
+    # point, every point is in at most two of them, and the y-sweep window of
+    # a sub-band that narrow stays O(1).
+    if hi - lo <= block:
+        return min(d, closest_pair(list(map(tuple, points[lo:hi].tolist()))))
+
+    xs = points[:, 0]
+    start = lo
+    while start < hi and d > 0:
+        x = xs[start].item()
+        end = bisect_left(xs, x + 2 * d, start, hi)
+        d = _sub_band_closest(points, start, end, d, block, workdir)
+        if end == hi:
+            break
+        start = bisect_left(xs, x + d, start, hi)
+    return d
+
+
+def _sub_band_closest(points, lo, hi, d, block, workdir):
+    if hi - lo <= block:
+        return min(d, closest_pair(list(map(tuple, points[lo:hi].tolist()))))
+
+    band_path = os.path.join(workdir, "band.bin")
+    with open(band_path, "wb") as f:
+        for start in range(lo, hi, block):
+            np.asarray(points[start:min(start + block, hi)]).tofile(f)
+    by_y = external_sort_points(band_path, os.path.join(workdir, "band_y.bin"), block, workdir, by="y")
+    return _sweep_by_y(by_y, d, block)
+
+
+def closest_pair_external(path, memory_limit=256 << 20, tmpdir=None):
+    # Closest distance for a point file larger than RAM. The file is sorted by
+    # x on disk and every x-slab is solved on its own. A pair closer than d
+    # that crosses a slab boundary lies in the band of points within d of that
+    # boundary; bands that fit in memory are solved directly, larger ones
+    # (dense vertical strips) are sorted by y on disk and swept.
+    block = max(memory_limit // POINT_BYTES // 2, 4)
+    d = float("inf")
+
+    with tempfile.TemporaryDirectory(dir=tmpdir) as workdir:
+        sorted_path = external_sort_points(path, os.path.join(workdir, "sorted.bin"), block, workdir)
+
+        # (first x, last x) of every slab
+        slabs = []
+        for points in _point_blocks(sorted_path, block):
+            slabs.append((points[0, 0].item(), points[-1, 0].item()))
+            d = min(d, closest_pair(list(map(tuple, points.tolist()))))
+            if d == 0:
+                return d
+        if len(slabs) < 2:
+            return d
+
+        points = np.memmap(sorted_path, dtype=np.int64, mode="r").reshape(-1, 2)
+        xs = points[:, 0]
+        pending = None
+        for (_, last_x), (first_x, _) in zip(slabs, slabs[1:]):
+            lo = bisect_right(xs, first_x - d)
+            hi = bisect_left(xs, last_x + d)
+            if pending is not None and lo <= pending[1]:
+                pending = (pending[0], max(pending[1], hi))
+                continue
+            if pending is not None:
+                d = _band_closest(points, pending[0], pending[1], d, block, workdir)
+            pending = (lo, hi)
+        d = _band_closest(points, pending[0], pending[1], d, block, workdir)
+        del xs, points
+
+    return d
+
+
+def run_closest_pair(memory_limit=None):
     print("Closest Pair Results\n")
 
     folder = "inputs_closest"
@@ -68,11 +375,12 @@ def run_closest_pair():
     for file in sorted(os.listdir(folder)):
         path = os.path.join(folder, file)
 
-        points = []
-        with open(path, "r") as f:
-            for line in f:
-                x, y = map(int, line.split())
-                points.append((x, y))
+        if memory_limit is not None:
+            d = closest_pair_external(path, memory_limit)
+            print(f"{file} → Closest distance = {d:.4f}")
+            continue
+
+        points = load_points(path)
 
         d = closest_pair(points)
         print(f"{file} → Closest distance = {d:.4f}")
@@ -80,7 +388,57 @@ def run_closest_pair():
     print()
 
 
+def _random_points(rng, n, coord_max=1000):
+    return [tuple(p) for p in rng.integers(0, coord_max + 1, size=(n, 2)).tolist()]
+
+
+def test_closest_pair_between():
+    print("=" * 60)
+    print("Bichromatic Closest Pair vs Brute Force")
+    print("=" * 60)
+    rng = np.random.default_rng(47)
+    for n, m in [(1, 1), (10, 400), (400, 10), (600, 600)]:
+        A = _random_points(rng, n)
+        B = _random_points(rng, m)
+        d, a, b = closest_pair_between(A, B)
+        expected = min(dist(p, q) for p in A for q in B)
+        print(f"|A| = {n:<4} |B| = {m:<4} → {d:.4f} between {a} and {b}, "
+              f"brute force {expected:.4f}, match: {d == expected}")
+    print()
+
+    print("=" * 60)
+    print("Nearest Point of B for Every Point of A")
+    print("=" * 60)
+    A = _random_points(rng, 300)
+    B = _random_points(rng, 200)
+    found = nearest_neighbors(A, B)
+    expected = [min(dist(a, b) for b in B) for a in A]
+    print(f"Queries: {len(A)}, index size: {len(B)}")
+    print(f"All distances match brute force: {[d for d, _ in found] == expected}")
+    print()
+
+
+def test_closest_pair_external():
+    print("=" * 60)
+    print("Out-of-Core Closest Pair vs In-Memory (budget: 64 points)")
+    print("=" * 60)
+    memory_limit = 64 * POINT_BYTES
+    with tempfile.TemporaryDirectory() as folder:
+        for seed, distribution in enumerate(sorted(POINT_DISTRIBUTIONS)):
+            for fmt in ("text", "binary"):
+                path = os.path.join(folder, f"{distribution}.{'bin' if fmt == 'binary' else 'txt'}")
+                write_point_file(path, seed, 2000, coord_max=10**6, fmt=fmt,
+                                 distribution=distribution)
+                external = closest_pair_external(path, memory_limit, tmpdir=folder)
+                in_memory = closest_pair(load_points(path))
+                print(f"{distribution:>10} ({fmt:>6}): external {external:.4f}, "
+                      f"in memory {in_memory:.4f}, match: {external == in_memory}")
+    print()
+
+
 if __name__ == "__main__":
     generate_inputs()
     run_closest_pair()
+    test_closest_pair_between()
+    test_closest_pair_external()
     print("Completed Closest Pair Execution.")
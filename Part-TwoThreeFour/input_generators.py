@@ -0,0 +1,233 @@
+import argparse
+import filecmp
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+CHUNK_ROWS = 1 << 20
+
+
+def _file_seeds(seed, count):
+    # One independent stream per file, so the output does not depend on how
+    # many workers wrote it.
+    return np.random.SeedSequence(seed).spawn(count)
+
+
+def _draw_size(rng, size):
+    if isinstance(size, tuple):
+        return int(rng.integers(size[0], size[1] + 1))
+    return size
+
+
+def _run(task, jobs, workers):
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(task, *zip(*jobs)))
+    return [task(*job) for job in jobs]
+
+
+def _uniform(rng, n, coord_max):
+    return lambda rows: rng.integers(0, coord_max + 1, size=(rows, 2), dtype=np.int64)
+
+
+def _clustered(rng, n, coord_max, clusters=8):
+    centers = rng.integers(0, coord_max + 1, size=(clusters, 2))
+    spread = max(coord_max // 200, 1)
+
+    def sample(rows):
+        around = centers[rng.integers(0, clusters, size=rows)]
+        points = np.rint(around + rng.normal(0, spread, size=(rows, 2))).astype(np.int64)
+        return np.clip(points, 0, coord_max)
+    return sample
+
+
+def _collinear(rng, n, coord_max):
+    # Lattice points on one line through the origin
+    dx, dy = rng.integers(1, 10, size=2)
+    steps = coord_max // max(dx, dy)
+
+    def sample(rows):
+        t = rng.integers(0, steps + 1, size=rows, dtype=np.int64)
+        return np.stack([t * dx, t * dy], axis=1)
+    return sample
+
+
+def _duplicates(rng, n, coord_max):
+    # Every point is drawn from a pool of about n / 20 distinct locations
+    pool = rng.integers(0, coord_max + 1, size=(max(n // 20, 1), 2), dtype=np.int64)
+    return lambda rows: pool[rng.integers(0, len(pool), size=rows)]
+
+
+def _grid(rng, n, coord_max, spacing=10):
+    # Many pairs tie at exactly `spacing`
+    cells = coord_max // spacing
+    return lambda rows: rng.integers(0, cells + 1, size=(rows, 2), dtype=np.int64) * spacing
+
+
+def _strip(rng, n, coord_max):
+    # Every point lies within one unit of the dividing line, so the strip
+    # check in closest_pair_rec sees all of them
+    middle = coord_max // 2
+
+    def sample(rows):
+        x = middle + rng.integers(0, 2, size=rows, dtype=np.int64)
+        y = rng.integers(0, coord_max + 1, size=rows, dtype=np.int64)
+        return np.stack([x, y], axis=1)
+    return sample
+
+
+POINT_DISTRIBUTIONS = {
+    "uniform": _uniform,
+    "clustered": _clustered,
+    "collinear": _collinear,
+    "duplicates": _duplicates,
+    "grid": _grid,
+    "strip": _strip,
+}
+
+
+def write_point_file(path, seed, size, coord_max=10000, fmt="text", distribution="uniform"):
+    """Write `size` integer points, as "x y" lines or as int64 pairs."""
+    rng = np.random.default_rng(seed)
+    n = _draw_size(rng, size)
+    sample = POINT_DISTRIBUTIONS[distribution](rng, n, coord_max)
+
+    with open(path, "wb") as f:
+        remaining = n
+        while remaining:
+            rows = min(remaining, CHUNK_ROWS)
+            points = sample(rows)
+            if fmt == "binary":
+                points.tofile(f)
+            else:
+                f.write(("%d %d\n" * rows % tuple(points.ravel().tolist())).encode())
+            remaining -= rows
+
+    return path
+
+
+def write_integer_file(path, seed, digits):
+    """Write two random integers with `digits` digits each, one per line."""
+    rng = np.random.default_rng(seed)
+    n = _draw_size(rng, digits)
+
+    with open(path, "wb") as f:
+        for _ in range(2):
+            f.write(str(rng.integers(1, 10)).encode())
+            remaining = n - 1
+            while remaining:
+                count = min(remaining, CHUNK_ROWS)
+                f.write((rng.integers(0, 10, size=count, dtype=np.uint8) + ord("0")).tobytes())
+                remaining -= count
+            f.write(b"\n")
+
+    return path
+
+
+def generate_point_files(folder, count=10, size=(100, 300), seed=None,
+                         coord_max=10000, fmt="text", workers=0, prefix="closest_points",
+                         distribution="uniform"):
+    """Generate `count` point files; `size` is a point count or a (low, high) range."""
+    if distribution not in POINT_DISTRIBUTIONS:
+        raise ValueError(f"unknown distribution: {distribution}")
+    os.makedirs(folder, exist_ok=True)
+    extension = "bin" if fmt == "binary" else "txt"
+
+    jobs = [(os.path.join(folder, f"{prefix}_{i}.{extension}"), file_seed, size, coord_max, fmt,
+             distribution)
+            for i, file_seed in enumerate(_file_seeds(seed, count), start=1)]
+    return _run(write_point_file, jobs, workers)
+
+
+def generate_integer_files(folder, count=10, digits=(100, 200), seed=None,
+                           workers=0, prefix="input"):
+    """Generate `count` files of two integers; `digits` is a length or a (low, high) range."""
+    os.makedirs(folder, exist_ok=True)
+
+    jobs = [(os.path.join(folder, f"{prefix}_{i}.txt"), file_seed, digits)
+            for i, file_seed in enumerate(_file_seeds(seed, count), start=1)]
+    return _run(write_integer_file, jobs, workers)
+
+
+def _size_arg(text):
+    if "-" in text:
+        low, high = text.split("-")
+        return int(low), int(high)
+    return int(text)
+
+
+def test_generators():
+    print("=" * 70)
+    print("Test Case 1: Same seed, different worker counts")
+    print("=" * 70)
+    with tempfile.TemporaryDirectory() as folder:
+        serial = generate_point_files(os.path.join(folder, "serial"), 4, (50, 80), seed=7)
+        parallel = generate_point_files(os.path.join(folder, "parallel"), 4, (50, 80), seed=7,
+                                        workers=2)
+        same = all(filecmp.cmp(a, b, shallow=False) for a, b in zip(serial, parallel))
+        print(f"Files: {len(serial)} serial, {len(parallel)} with 2 workers")
+        print(f"Identical output: {same}")
+        other = generate_point_files(os.path.join(folder, "other"), 4, (50, 80), seed=8)
+        print(f"Different seed changes the output: "
+              f"{not filecmp.cmp(serial[0], other[0], shallow=False)}")
+    print()
+
+    print("=" * 70)
+    print("Test Case 2: Text and binary files hold the same points")
+    print("=" * 70)
+    with tempfile.TemporaryDirectory() as folder:
+        for distribution in sorted(POINT_DISTRIBUTIONS):
+            text, = generate_point_files(folder, 1, 1000, seed=3, distribution=distribution,
+                                         prefix=distribution)
+            binary, = generate_point_files(folder, 1, 1000, seed=3, fmt="binary",
+                                           distribution=distribution, prefix=distribution)
+            from_text = np.loadtxt(text, dtype=np.int64).reshape(-1, 2)
+            from_binary = np.fromfile(binary, dtype=np.int64).reshape(-1, 2)
+            match = np.array_equal(from_text, from_binary)
+            print(f"{distribution:>10}: {len(from_text)} points, match: {match}")
+    print()
+
+    print("=" * 70)
+    print("Test Case 3: Integer files")
+    print("=" * 70)
+    with tempfile.TemporaryDirectory() as folder:
+        paths = generate_integer_files(folder, 3, (20, 40), seed=11)
+        for path in paths:
+            with open(path) as f:
+                a, b = (line.strip() for line in f)
+            print(f"{os.path.basename(path)}: {len(a)} and {len(b)} digits, "
+                  f"leading digits nonzero: {a[0] != '0' and b[0] != '0'}")
+    print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate reproducible input corpora.")
+    parser.add_argument("kind", choices=["points", "integers", "check"],
+                        help="'check' runs the self-test demo instead of writing files")
+    parser.add_argument("folder", nargs="?")
+    parser.add_argument("--count", type=int, default=10)
+    parser.add_argument("--size", type=_size_arg, default=None,
+                        help="points (or digits) per file, or a LOW-HIGH range")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--format", choices=["text", "binary"], default="text")
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--distribution", choices=sorted(POINT_DISTRIBUTIONS), default="uniform")
+    args = parser.parse_args()
+
+    if args.kind == "check":
+        test_generators()
+        raise SystemExit
+    if args.folder is None:
+        parser.error("folder is required")
+
+    if args.kind == "points":
+        paths = generate_point_files(args.folder, args.count, args.size or (100, 300),
+                                     args.seed, fmt=args.format, workers=args.workers,
+                                     distribution=args.distribution)
+    else:
+        paths = generate_integer_files(args.folder, args.count, args.size or (100, 200),
+                                       args.seed, workers=args.workers)
+    print(f"Generated {len(paths)} files in {args.folder}")
@@ -1,9 +1,18 @@
 import os
-import random
+import sys
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "Part-One"))
+from divide_conquer import DivideAndConquer, run
+from input_generators import generate_integer_files
 
-def karatsuba(x, y):
+
+def karatsuba(x, y, cutoff=32, workers=0):
     """Perform multiplication using Karatsuba's divide-and-conquer algorithm."""
+    return run(KaratsubaAlgorithm(), (x, y), cutoff, workers)
+
+
+def _karatsuba(x, y):
+    """Recursive Karatsuba, used for operands below the digit cutoff."""
 
     if x < 10 or y < 10:
         return x * y
@@ -14,27 +23,51 @@ def karatsuba(x, y):
     x_high, x_low = divmod(x, 10 ** half)
     y_high, y_low = divmod(y, 10 ** half)
 
-    z0 = karatsuba(x_low, y_low)
-    z1 = karatsuba(x_low + x_high, y_low + y_high)
-    z2 = karatsuba(x_high, y_high)
+    z0 = _karatsuba(x_low, y_low)
+    z1 = _karatsuba(x_low + x_high, y_low + y_high)
+    z2 = _karatsuba(x_high, y_high)
 
     return (z2 * 10 ** (2 * half)) + ((z1 - z2 - z0) * 10 ** half) + z0
 
 
+class KaratsubaAlgorithm(DivideAndConquer):
+    """Karatsuba on the generic framework; a problem is an (x, y) pair."""
+
+    def size(self, problem):
+        return max(len(str(problem[0])), len(str(problem[1])))
+
+    def is_base(self, problem):
+        x, y = problem
+        return x < 10 or y < 10
+
+    def base(self, problem):
+        x, y = problem
+        return x * y
+
+    def sequential(self, problem):
+        return _karatsuba(*problem)
+
+    def divide(self, problem):
+        x, y = problem
+        half = self.size(problem) // 2
+
+        x_high, x_low = divmod(x, 10 ** half)
+        y_high, y_low = divmod(y, 10 ** half)
+
+        return [(x_low, y_low), (x_low + x_high, y_low + y_high), (x_high, y_high)]
+
+    def combine(self, problem, results):
+        z0, z1, z2 = results
+        half = self.size(problem) // 2
+        return (z2 * 10 ** (2 * half)) + ((z1 - z2 - z0) * 10 ** half) + z0
 
-def generate_inputs():
-    """Generate 10 input files, each containing two large integers."""
-    os.makedirs("integer_multiplication_inputs", exist_ok=True)
 
-    for i in range(1, 11):
-        digits = random.randint(100, 200)  
-        x = random.randint(10**(digits - 1), 10**digits - 1)
-        y = random.randint(10**(digits - 1), 10**digits - 1)
 
-        with open(f"integer_multiplication_inputs/input_{i}.txt", "w") as f:
-            f.write(f"{x}\n{y}\n")
+def generate_inputs(seed=None, count=10, digits=(100, 200), workers=0):
+    """Generate input files, each containing two large integers."""
+    generate_integer_files("integer_multiplication_inputs", count, digits, seed, workers=workers)
 
-    print("Generated 10 input files for Integer Multiplication.\n")
+    print(f"Generated {count} input files for Integer Multiplication.\n")
 
 
 
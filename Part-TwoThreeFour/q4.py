@@ -24,6 +24,8 @@ def strip_closest(strip, d):
     return min_val
 
 def closest_pair(points):
+    if len(set(map(tuple, points))) < len(points):
+        return 0.0
     points.sort()
     return closest_pair_rec(points)
 
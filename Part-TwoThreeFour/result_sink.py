@@ -0,0 +1,252 @@
+import gzip
+import json
+import os
+import tempfile
+import time
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def _codec(path):
+    # Compression follows the file name: .gz, .zst or plain JSON Lines
+    if path.endswith(".gz"):
+        return gzip.compress, gzip.decompress
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise ImportError("writing .zst results requires the zstandard package")
+        return zstandard.ZstdCompressor().compress, zstandard.ZstdDecompressor().decompress
+    return bytes, bytes
+
+
+def _index_entries(path):
+    # Streamed line by line. Every index line is written in one piece ending
+    # with a newline, so a line without one was cut off by a crash; its block
+    # was never completed and it is skipped.
+    with open(path + ".idx", "rb") as index:
+        for line in index:
+            if not line.endswith(b"\n"):
+                return
+            yield json.loads(line)
+
+
+def _line_start(f, end, step=1 << 12):
+    # Offset just after the last newline before `end`, found by reading
+    # backwards from `end` instead of loading the file
+    pos = end
+    while pos > 0:
+        size = min(step, pos)
+        pos -= size
+        f.seek(pos)
+        cut = f.read(size).rfind(b"\n")
+        if cut >= 0:
+            return pos + cut + 1
+    return 0
+
+
+def _drop_torn_line(path):
+    with open(path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        if end == 0:
+            return
+        f.seek(end - 1)
+        if f.read(1) != b"\n":
+            f.truncate(_line_start(f, end))
+
+
+def _indexed_end(path):
+    # End of the last block in the index, read from the index's last line
+    if not os.path.exists(path + ".idx"):
+        return 0
+    with open(path + ".idx", "rb") as index:
+        end = index.seek(0, os.SEEK_END)
+        if end == 0:
+            return 0
+        index.seek(_line_start(index, end - 1))
+        entry = json.loads(index.read())
+    return entry["offset"] + entry["length"]
+
+
+class ResultSink:
+    """Append-only JSON Lines writer with a per-block index.
+
+    Records are grouped into blocks of `block_records` lines (default 256 for
+    plain output, 64 for compressed output) and `<path>.idx` gets one line per
+    block with its byte range and the line numbers of every input file in it.
+    Plain output writes and flushes each record as it arrives; compressed
+    output writes each block as one independent gzip member / zstd frame, so a
+    crash loses at most the unflushed block. mode="w" starts a new output,
+    mode="a" appends to an existing one and first repairs what a crash left
+    behind: a torn last line, and for plain output the records written after
+    the last index line, which become part of the next block.
+    """
+
+    def __init__(self, path, mode="a", key="file", block_records=None, fsync_interval=1.0):
+        if mode not in ("a", "w"):
+            raise ValueError(f"mode must be 'a' or 'w', not {mode!r}")
+        self.path = path
+        self.key = key
+        self.compress, decompress = _codec(path)
+        self.plain = decompress is bytes
+        if block_records is None:
+            block_records = 256 if self.plain else 64
+        self.block_records = block_records
+        self.fsync_interval = fsync_interval
+
+        end = 0
+        if mode == "a" and os.path.exists(path):
+            if os.path.exists(path + ".idx"):
+                _drop_torn_line(path + ".idx")
+            end = _indexed_end(path)
+            if self.plain:
+                _drop_torn_line(path)
+            else:
+                os.truncate(path, end)
+
+        self.data = open(path, mode + "b")
+        self.index = open(path + ".idx", mode)
+        self.lines = []
+        self.files = {}
+        self.count = 0
+        self.offset = self.data.seek(0, os.SEEK_END)
+        self.last_sync = time.monotonic()
+
+        if self.plain and self.offset > end:
+            # Complete records past the last index line are adopted into the
+            # current block; there are fewer than block_records of them
+            with open(path, "rb") as f:
+                f.seek(end)
+                for line in f:
+                    self._add(json.loads(line))
+            self.offset = end
+            if self.count >= self.block_records:
+                self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _add(self, record):
+        self.files.setdefault(str(record.get(self.key)), []).append(self.count)
+        self.count += 1
+
+    def write(self, record):
+        self._add(record)
+        line = json.dumps(record, separators=(",", ":")).encode() + b"\n"
+        if self.plain:
+            self.data.write(line)
+            self.data.flush()
+        else:
+            self.lines.append(line)
+        if self.count >= self.block_records:
+            self.flush()
+
+    def flush(self, sync=False):
+        if self.count:
+            if self.plain:
+                length = self.data.tell() - self.offset
+            else:
+                block = self.compress(b"".join(self.lines))
+                self.data.write(block)
+                self.data.flush()
+                length = len(block)
+                self.lines = []
+            # The index line is only written once its block is in the data file
+            self.index.write(json.dumps({"offset": self.offset, "length": length,
+                                         "files": self.files}, separators=(",", ":")) + "\n")
+            self.index.flush()
+            self.offset += length
+            self.files = {}
+            self.count = 0
+
+        if sync or time.monotonic() - self.last_sync >= self.fsync_interval:
+            os.fsync(self.data.fileno())
+            os.fsync(self.index.fileno())
+            self.last_sync = time.monotonic()
+
+    def close(self):
+        if self.data.closed:
+            return
+        self.flush(sync=True)
+        self.data.close()
+        self.index.close()
+
+
+def read_results(path):
+    """Stream every record of a sink file."""
+    _, decompress = _codec(path)
+    with open(path, "rb") as data:
+        for entry in _index_entries(path):
+            data.seek(entry["offset"])
+            for record in decompress(data.read(entry["length"])).splitlines():
+                yield json.loads(record)
+
+
+def lookup_results(path, file):
+    """Records for one input file, decoding only the blocks that contain it."""
+    _, decompress = _codec(path)
+    results = []
+    with open(path, "rb") as data:
+        for entry in _index_entries(path):
+            positions = entry["files"].get(str(file))
+            if not positions:
+                continue
+            data.seek(entry["offset"])
+            records = decompress(data.read(entry["length"])).splitlines()
+            results.extend(json.loads(records[i]) for i in positions)
+    return results
+
+
+def test_result_sink():
+    records = [{"file": f"input_{i % 10}.txt", "row": i, "result": i * i} for i in range(100)]
+    extensions = [".jsonl", ".jsonl.gz"] + ([".jsonl.zst"] if zstandard is not None else [])
+
+    print("=" * 60)
+    print("Test Case 1: Write, read back and look up one input file")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as folder:
+        for extension in extensions:
+            path = os.path.join(folder, "results" + extension)
+            with ResultSink(path, mode="w") as sink:
+                for record in records:
+                    sink.write(record)
+            same = list(read_results(path)) == records
+            found = lookup_results(path, "input_3.txt")
+            expected = [r for r in records if r["file"] == "input_3.txt"]
+            print(f"{extension:>11}: {os.path.getsize(path)} bytes, read back: {same}, "
+                  f"lookup input_3.txt: {len(found)} records, match: {found == expected}")
+    print()
+
+    print("=" * 60)
+    print("Test Case 2: Append after a crash mid-write")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "results.jsonl.gz")
+        with ResultSink(path, mode="w") as sink:
+            for record in records[:50]:
+                sink.write(record)
+        # A torn block and a torn index line, as left by a killed process
+        with open(path, "ab") as f:
+            f.write(gzip.compress(b'{"file":"input_0.txt"')[:10])
+        with open(path + ".idx", "a") as f:
+            f.write('{"offset":')
+        print(f"After the crash: {len(list(read_results(path)))} records readable")
+
+        with ResultSink(path) as sink:
+            for record in records[50:]:
+                sink.write(record)
+        print(f"After appending: {len(list(read_results(path)))} records, "
+              f"match: {list(read_results(path)) == records}")
+
+        with ResultSink(path, mode="w") as sink:
+            sink.write(records[0])
+        print(f"After a rerun with mode='w': {len(list(read_results(path)))} record")
+    print()
+
+
+if __name__ == "__main__":
+    test_result_sink()
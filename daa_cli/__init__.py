@@ -0,0 +1,46 @@
+import importlib.util
+import os
+import sys
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPTS = {
+    "QuestionA": "Part-One/QuestionA.py",
+    "QuestionB": "Part-One/QuestionB.py",
+    "QuestionC": "Part-One/QuestionC.py",
+    "QuestionE": "Part-One/QuestionE.py",
+    "QuestionF": "Part-One/QuestionF.py",
+    "QuestionG": "Part-One/QuestionG.py",
+    "QuestionH1": "Part-One/QuestionH-1.py",
+    "QuestionH2": "Part-One/QuestionH-2.py",
+    "QuestionH3": "Part-One/QuestionH-3.py",
+    "closest_pair": "Part-TwoThreeFour/closest_pair_q2_part1.py",
+    "karatsuba": "Part-TwoThreeFour/karatsuba_q2_part2.py",
+}
+
+_loaded = {}
+
+
+def add_to_path(folder):
+    # The scripts import their shared helpers (e.g. instrumentation) by
+    # plain module name, as they do when run from their own folder.
+    if folder not in sys.path:
+        sys.path.insert(0, folder)
+
+
+def load_instrumentation():
+    add_to_path(os.path.join(ROOT, "Part-One"))
+    return importlib.import_module("instrumentation")
+
+
+def load_script(name):
+    if name not in _loaded:
+        path = os.path.join(ROOT, SCRIPTS[name])
+        add_to_path(os.path.dirname(path))
+        spec = importlib.util.spec_from_file_location(f"daa_cli.scripts.{name}", path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[spec.name] = module
+        spec.loader.exec_module(module)
+        _loaded[name] = module
+    return _loaded[name]
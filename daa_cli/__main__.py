@@ -0,0 +1,6 @@
+import sys
+
+from daa_cli.cli import main
+
+
+sys.exit(main())
@@ -0,0 +1,329 @@
+import argparse
+import json
+import os
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from daa_cli import load_instrumentation, load_script
+
+
+def parse_number(token):
+    try:
+        return int(token)
+    except ValueError:
+        pass
+    try:
+        return float(token)
+    except ValueError:
+        raise SystemExit(f"invalid number: {token!r}") from None
+
+
+def open_input(path, fmt):
+    if path == "-":
+        return sys.stdin.buffer if fmt == "binary" else sys.stdin
+    return open(path, "rb" if fmt == "binary" else "r", newline="" if fmt == "text" else None)
+
+
+def read_streams(paths, fmt):
+    for path in paths or ["-"]:
+        stream = open_input(path, fmt)
+        try:
+            yield stream
+        finally:
+            if path != "-":
+                stream.close()
+
+
+def read_numbers(paths, fmt, dtype):
+    for stream in read_streams(paths, fmt):
+        if fmt == "jsonl":
+            for line in stream:
+                if line.strip():
+                    yield parse_json(line)
+        elif fmt == "binary":
+            values = array(dtype)
+            values.frombytes(stream.read())
+            yield values.tolist()
+        else:
+            yield [parse_number(token) for token in stream.read().split()]
+
+
+def parse_json(line):
+    try:
+        return json.loads(line)
+    except ValueError as error:
+        raise SystemExit(f"invalid jsonl line: {error}") from None
+
+
+def read_points(paths, fmt, dtype):
+    for values in read_numbers(paths, fmt, dtype):
+        if fmt == "jsonl":
+            yield [tuple(point) for point in values]
+        else:
+            yield list(zip(values[0::2], values[1::2]))
+
+
+def read_databases(paths, fmt, dtype):
+    if fmt == "jsonl":
+        yield from read_numbers(paths, fmt, dtype)
+    else:
+        yield [sorted(values) for values in read_numbers(paths, fmt, dtype)]
+
+
+def read_cards(paths, fmt, dtype):
+    H3 = load_script("QuestionH3")
+    if fmt == "binary":
+        raise SystemExit("majority: binary input is not supported, use text (CSV) or jsonl")
+
+    batch = H3.CardBatch()
+    for stream in read_streams(paths, fmt):
+        if fmt == "jsonl":
+            for line in stream:
+                if line.strip():
+                    record = parse_json(line)
+                    batch.append(int(record["card_id"]), record["account"])
+        else:
+            batch.extend_csv(stream)
+    yield batch
+
+
+def require_values(values, command):
+    if len(values) == 0:
+        raise SystemExit(f"{command}: empty input")
+
+
+def solve_min_max(values, args):
+    require_values(values, "min-max")
+    A = load_script("QuestionA")
+    min_val, max_val = A.find_min_max(values, 0, len(values) - 1)
+    return {"min": min_val, "max": max_val}
+
+
+def solve_min_max_numpy(instances, args):
+    import numpy as np
+    for values in instances:
+        require_values(values, "min-max")
+        values = np.asarray(values)
+        yield {"min": values.min().item(), "max": values.max().item()}
+
+
+def solve_power(values, args):
+    if len(values) != 2 or not isinstance(values[1], int) or values[1] < 0:
+        raise SystemExit(f"power: expected 'a n' with a non-negative integer n, got {values}")
+    B = load_script("QuestionB")
+    a, n = values
+    return {"a": a, "n": n, "power": B.power_divide_conquer(a, n)}
+
+
+def solve_inversions(values, args):
+    if args.significant:
+        H2 = load_script("QuestionH2")
+        if args.instrument:
+            count, _, comparisons = H2.count_significant_inversions_counted(values)
+            return {"significant_inversions": count, "comparisons": comparisons}
+        count, _ = H2.count_significant_inversions(values)
+        return {"significant_inversions": count}
+    C = load_script("QuestionC")
+    values = list(values)
+    return {"inversions": C.count_inversions(values, 0, len(values) - 1)}
+
+
+def solve_closest_1d(values, args):
+    require_values(values, "closest-1d")
+    E = load_script("QuestionE")
+    values = sorted(values)
+    return {"min_gap": E.closest_pair_1d(values, 0, len(values) - 1)}
+
+
+def solve_closest_1d_numpy(instances, args):
+    import numpy as np
+    for values in instances:
+        require_values(values, "closest-1d")
+        gaps = np.diff(np.sort(np.asarray(values)))
+        yield {"min_gap": gaps.min().item() if len(gaps) else float('inf')}
+
+
+def solve_peak(values, args):
+    require_values(values, "peak")
+    F = load_script("QuestionF")
+    if args.instrument:
+        value, index, comparisons = F.find_peak_unimodal_counted(values)
+        return {"peak": value, "index": index, "comparisons": comparisons}
+    value, index = F.find_peak_unimodal(values)
+    return {"peak": value, "index": index}
+
+
+def solve_peak_numpy(instances, args):
+    F = load_script("QuestionF")
+    instances = list(instances)
+    if not instances:
+        return
+    for values in instances:
+        require_values(values, "peak")
+    values, indices, comparisons = F.find_peak_unimodal_batch(instances)
+    for value, index, count in zip(values.tolist(), indices.tolist(), comparisons.tolist()):
+        yield {"peak": value, "index": index, "comparisons": count}
+
+
+def solve_stock(values, args):
+    G = load_script("QuestionG")
+    if args.k is not None or args.fee or args.cooldown:
+        return {"profit": G.max_profit(values, args.k, args.fee, args.cooldown)}
+    buy, sell, profit = G.find_best_transaction_streaming(values)
+    return {"buy_day": buy, "sell_day": sell, "profit": profit}
+
+
+def solve_stock_numpy(instances, args):
+    import numpy as np
+    G = load_script("QuestionG")
+    for values in instances:
+        matrix = np.asarray(values)[:, None]
+        if args.k is not None or args.fee or args.cooldown:
+            profit = G.max_profits_matrix(matrix, args.k, args.fee, args.cooldown)
+            yield {"profit": profit[0].item()}
+        else:
+            buys, sells, profits = G.find_best_transactions_matrix(matrix)
+            yield {"buy_day": buys[0].item() or None, "sell_day": sells[0].item() or None,
+                   "profit": profits[0].item() if buys[0] else 0}
+
+
+def solve_median(databases, args):
+    H1 = load_script("QuestionH1")
+    dbs = [H1.Database(values, f"DB{i + 1}") for i, values in enumerate(databases)]
+    if args.k is not None:
+        result = H1.kth_smallest(dbs, args.k)
+    elif len(dbs) == 2 and dbs[0].size() == dbs[1].size():
+        result, _ = H1.find_median_two_databases(dbs[0], dbs[1])
+    else:
+        result = H1.median_of_databases(dbs)
+    return {"value": result, "queries": sum(db.query_count for db in dbs)}
+
+
+def solve_majority(batch, args):
+    H3 = load_script("QuestionH3")
+    if args.backend == "parallel":
+        # Count the integer account codes of the columnar batch directly
+        counts = H3.find_frequent_accounts(batch.account_ids, args.k, None,
+                                           args.workers or os.cpu_count())
+        return {"accounts": sorted(batch.accounts[code] for code in counts)}
+    if args.k == 2:
+        card = H3.find_majority_in_batch(batch)
+        return {"accounts": [card.account] if card else []}
+    return {"accounts": sorted(card.account for card in H3.find_frequent_in_batch(batch, args.k))}
+
+
+def solve_closest_pair(points, args):
+    CP = load_script("closest_pair")
+    return {"closest_distance": CP.closest_pair(list(points))}
+
+
+def solve_karatsuba(values, args):
+    if len(values) != 2 or not all(isinstance(value, int) for value in values):
+        raise SystemExit(f"karatsuba: expected two integers, got {values}")
+    K = load_script("karatsuba")
+    x, y = values
+    return {"product": K.karatsuba(x, y)}
+
+
+# name: (help, reader, pure solver, numpy batch solver or None, parallel over instances)
+COMMANDS = {
+    "min-max": ("minimum and maximum (QuestionA)", read_numbers,
+                solve_min_max, solve_min_max_numpy, True),
+    "power": ("a^n by repeated squaring (QuestionB)", read_numbers,
+              solve_power, None, True),
+    "inversions": ("inversion count (QuestionC, QuestionH-2)", read_numbers,
+                   solve_inversions, None, True),
+    "closest-1d": ("smallest gap between values (QuestionE)", read_numbers,
+                   solve_closest_1d, solve_closest_1d_numpy, True),
+    "peak": ("peak of a unimodal array (QuestionF)", read_numbers,
+             solve_peak, solve_peak_numpy, True),
+    "stock": ("best stock transactions (QuestionG)", read_numbers,
+              solve_stock, solve_stock_numpy, True),
+    "median": ("median or k-th smallest across sorted databases (QuestionH-1)",
+               read_databases, solve_median, None, True),
+    "majority": ("accounts with a majority of cards (QuestionH-3)", read_cards,
+                 solve_majority, None, False),
+    "closest-pair": ("closest pair of 2D points (Part Two)", read_points,
+                     solve_closest_pair, None, True),
+    "karatsuba": ("Karatsuba multiplication (Part Two)", read_numbers,
+                  solve_karatsuba, None, True),
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m daa_cli",
+        description="Run the divide-and-conquer algorithms on files or stdin.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    for name, (help_text, *_) in COMMANDS.items():
+        sub = subparsers.add_parser(name, help=help_text)
+        sub.add_argument("inputs", nargs="*",
+                         help="input files (default: stdin); with --format jsonl "
+                              "every line is a separate instance")
+        sub.add_argument("--backend", choices=["pure", "numpy", "parallel"], default="pure")
+        sub.add_argument("--workers", type=int, default=None)
+        sub.add_argument("--format", choices=["text", "binary", "jsonl"], default="text",
+                         help="input format; binary applies to input only, results "
+                              "are written as jsonl for jsonl input and as text otherwise")
+        sub.add_argument("--dtype", default="d",
+                         help="array typecode of binary input (default: d, float64)")
+        sub.add_argument("--instrument", action="store_true",
+                         help="count operations and print them to stderr "
+                              "(not collected from parallel workers)")
+
+        if name == "inversions":
+            sub.add_argument("--significant", action="store_true",
+                             help="count pairs with a[i] > 2 * a[j]")
+        elif name == "stock":
+            sub.add_argument("--k", type=int, default=None,
+                             help="at most k transactions")
+            sub.add_argument("--fee", type=float, default=0)
+            sub.add_argument("--cooldown", action="store_true")
+        elif name == "median":
+            sub.add_argument("--k", type=int, default=None,
+                             help="k-th smallest instead of the median")
+        elif name == "majority":
+            sub.add_argument("--k", type=int, default=2,
+                             help="report accounts with more than n/k cards")
+
+    return parser
+
+
+def run(args):
+    _, reader, solve, solve_numpy, parallel = COMMANDS[args.command]
+    instances = reader(args.inputs, args.format, args.dtype)
+
+    if args.backend == "numpy":
+        if solve_numpy is None:
+            raise SystemExit(f"{args.command}: no numpy backend")
+        yield from solve_numpy(instances, args)
+    elif args.backend == "parallel" and parallel:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            yield from executor.map(partial(solve, args=args), instances)
+    else:
+        for instance in instances:
+            yield solve(instance, args)
+
+
+def write_results(results, fmt):
+    out = sys.stdout
+    for result in results:
+        if fmt == "jsonl":
+            out.write(json.dumps(result) + "\n")
+        else:
+            out.write(" ".join(f"{key}={value}" for key, value in result.items()) + "\n")
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if not args.instrument:
+        write_results(run(args), args.format)
+        return 0
+
+    with load_instrumentation().instrumented() as stats:
+        write_results(run(args), args.format)
+    print(stats.report(), file=sys.stderr)
+    return 0